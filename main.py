@@ -3668,11 +3668,14 @@ async def process_new_entries(limit: int = Query(50, ge=1, le=500)):
           and (t.starts_at IS NULL OR t.starts_at > NOW() - INTERVAL '3 hours')
         order by e.created_at asc
         limit %s
-    """, (limit,))
+    """, (limit + 1,))
     rows = cur.fetchall()
+    # Одна лишняя строка показывает, остались ли entries на следующий вызов
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
     # 2. После SQL выборки
-    print(f"SELECT count={len(rows)}")
+    print(f"SELECT count={len(rows)}, has_more={has_more}")
 
     processed = 0
     notified = 0
@@ -3826,6 +3829,7 @@ async def process_new_entries(limit: int = Query(50, ge=1, le=500)):
         "ok": True,
         "processed": processed,
         "notified": notified,
+        "has_more": has_more,
         "details": details
     }
 
@@ -0,0 +1,12 @@
+-- Migration: Add unique index on entries(tournament_id, player_id)
+-- Required by scripts/import_lunda.py bulk entry upsert (INSERT ... ON CONFLICT (tournament_id, player_id))
+--
+-- If index creation fails, there are duplicate entries. Find them with:
+--   SELECT tournament_id, player_id, COUNT(*) FROM entries
+--   GROUP BY tournament_id, player_id HAVING COUNT(*) > 1;
+
+DO $$
+BEGIN
+    CREATE UNIQUE INDEX IF NOT EXISTS entries_tournament_player_unique
+    ON entries(tournament_id, player_id);
+END $$;
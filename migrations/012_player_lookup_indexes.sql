@@ -0,0 +1,31 @@
+-- Migration: Ensure B-tree indexes for exact player lookups during import
+-- 006 only created idx_players_normalized_name together with the column, so databases
+-- where normalized_name was added by hand may be missing it.
+-- players(full_name) must be unique for upsert_player's ON CONFLICT (full_name).
+--
+-- normalized_name is intentionally NOT unique: "Иван Петров" and "иван петров" are
+-- distinct players by full_name but share a normalized name.
+--
+-- If the full_name index creation fails, there are duplicate players. Find them with:
+--   SELECT full_name, COUNT(*) FROM players GROUP BY full_name HAVING COUNT(*) > 1;
+
+DO $$
+BEGIN
+    CREATE INDEX IF NOT EXISTS idx_players_normalized_name
+    ON players(normalized_name);
+    
+    CREATE INDEX IF NOT EXISTS idx_player_aliases_normalized_alias
+    ON player_aliases(normalized_alias);
+    
+    -- Skip if full_name is already covered by a unique constraint/index
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = 'players'::regclass
+          AND i.indisunique
+          AND i.indnatts = 1
+          AND a.attname = 'full_name'
+    ) THEN
+        CREATE UNIQUE INDEX players_full_name_unique ON players(full_name);
+    END IF;
+END $$;
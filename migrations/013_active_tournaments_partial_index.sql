@@ -0,0 +1,16 @@
+-- Migration: Partial index on non-archived tournaments
+-- scripts/import_lunda.py archives with
+--   UPDATE tournaments ... WHERE archived_at IS NULL AND starts_at < ...
+-- on every sync. Archived rows only accumulate, so index just the active ones.
+--
+-- On a large live table run it outside a transaction instead:
+--   CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tournaments_active
+--   ON tournaments (starts_at) WHERE archived_at IS NULL;
+-- Check the plan with IMPORT_EXPLAIN=1 python scripts/import_lunda.py
+
+DO $$
+BEGIN
+    CREATE INDEX IF NOT EXISTS idx_tournaments_active
+    ON tournaments (starts_at)
+    WHERE archived_at IS NULL;
+END $$;
@@ -0,0 +1,12 @@
+-- Migration: Add unique index on tournaments(location, starts_at)
+-- Required by scripts/import_lunda.py bulk tournament upsert (INSERT ... ON CONFLICT (location, starts_at))
+--
+-- If index creation fails, there are duplicate tournaments. Find them with:
+--   SELECT location, starts_at, COUNT(*) FROM tournaments
+--   GROUP BY location, starts_at HAVING COUNT(*) > 1;
+
+DO $$
+BEGIN
+    CREATE UNIQUE INDEX IF NOT EXISTS tournaments_location_starts_at_unique
+    ON tournaments(location, starts_at);
+END $$;
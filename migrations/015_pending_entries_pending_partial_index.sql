@@ -0,0 +1,16 @@
+-- Migration: Partial index on pending (unresolved) pending_entries
+-- scripts/import_lunda.py expires stale entries at the end of every sync with
+--   UPDATE pending_entries SET status = 'expired' WHERE status = 'pending' AND sync_run_id <> ...
+-- Resolved/expired rows only accumulate, so index just the pending ones.
+--
+-- On a large live table run it outside a transaction instead:
+--   CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pending_entries_pending_run
+--   ON pending_entries (sync_run_id) WHERE status = 'pending';
+-- Check the plan with IMPORT_EXPLAIN=1 python scripts/import_lunda.py
+
+DO $$
+BEGIN
+    CREATE INDEX IF NOT EXISTS idx_pending_entries_pending_run
+    ON pending_entries (sync_run_id)
+    WHERE status = 'pending';
+END $$;
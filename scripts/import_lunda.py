@@ -12,19 +12,56 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
+import io
 import json
 import re
+from functools import lru_cache, partial
 from datetime import datetime, timezone, timedelta
+try:
+    import ijson  # optional: streaming JSON parser
+except ImportError:
+    ijson = None
+try:
+    import orjson  # optional: fast in-memory JSON parser
+except ImportError:
+    orjson = None
+try:
+    # optional: C edit distance and in-memory fuzzy pools
+    from rapidfuzz import process as _rf_process
+    from rapidfuzz.distance import Levenshtein as _Levenshtein
+except ImportError:
+    _rf_process = None
+    _Levenshtein = None
 import psycopg2
-from psycopg2.extras import execute_values
+from psycopg2.extras import execute_values, Json
+from psycopg2.pool import ThreadedConnectionPool
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import RetryAfter
 import sys
-import re
+import time
+import queue
+import asyncio
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # MSK timezone offset: UTC+3
 MSK_TZ = timezone(timedelta(hours=3))
 
+# Precompiled patterns / tables for hot-path string helpers
+_WS_RE = re.compile(r'\s+')
+_PRICE_RE = re.compile(r'(\d+)')
+_YO_TABLE = str.maketrans('ё', 'е')
+
+# Compact, non-escaped JSON for jsonb params (Cyrillic names stay 2 bytes/char instead of 6)
+_JSON_DUMPS = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+@lru_cache(maxsize=8192)
 def normalize_name(s):
     """
     Normalize name for comparison/searching.
@@ -32,28 +69,72 @@ def normalize_name(s):
     - replace 'ё' with 'е'
     - collapse whitespace
     Returns normalized string (NEVER show to users).
+    Memoized: the same names repeat across tournaments within a run.
     """
     if not s:
         return ""
-    # Strip and lowercase
-    s = s.strip().lower()
-    # Replace ё with е
-    s = s.replace('ё', 'е')
-    # Collapse whitespace
-    s = re.sub(r'\s+', ' ', s)
-    return s
+    # Strip, lowercase, replace ё with е, collapse whitespace
+    return _WS_RE.sub(' ', s.strip().lower().translate(_YO_TABLE))
+
+class ImportConnection(psycopg2.extensions.connection):
+    """Pooled connection that keeps one reusable client-side cursor (see shared_cursor)."""
+    shared_cur = None
+
+def shared_cursor(conn):
+    """
+    Return the connection's reusable cursor, created on first use. Callers must not close it.
+    Plain connections (e.g. passed in from main.py) get a fresh cursor on every call.
+    """
+    if not isinstance(conn, ImportConnection):
+        return conn.cursor()
+    if conn.shared_cur is None or conn.shared_cur.closed:
+        conn.shared_cur = conn.cursor()
+    return conn.shared_cur
+
+# Connection pool, created lazily: main.py imports this module and must not connect on import
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool(minconn=1, maxconn=10):
+    """Get (or create) the process-wide connection pool with SSL."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            database_url = os.getenv("DATABASE_URL")
+            if not database_url:
+                raise Exception("DATABASE_URL not set")
+            _POOL = ThreadedConnectionPool(
+                minconn, maxconn, database_url, sslmode="require",
+                connection_factory=ImportConnection
+            )
+    return _POOL
+
+def close_pool():
+    """Close all pooled connections."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.closeall()
+            _POOL = None
 
 def get_db_conn():
-    """Get database connection with SSL."""
-    database_url = os.getenv("DATABASE_URL")
-    if not database_url:
-        raise Exception("DATABASE_URL not set")
-    return psycopg2.connect(database_url, sslmode="require")
+    """Get database connection with SSL (checked out from the pool)."""
+    return get_pool().getconn()
+
+def release_conn(conn, close=False):
+    """Return connection to the pool. Broken connections are discarded."""
+    if conn is None or _POOL is None:
+        return
+    try:
+        _POOL.putconn(conn, close=close or getattr(conn, "closed", 1) != 0)
+    except Exception as e:
+        print(f"WARNING: Failed to release connection: {e}")
 
 def ensure_conn(conn):
     """Ensure database connection is alive. Reconnect if needed."""
     if conn is None or getattr(conn, "closed", 1) != 0:
         print("DB RECONNECT: Connection closed, reconnecting...")
+        release_conn(conn, close=True)
         return get_db_conn()
     return conn
 
@@ -72,11 +153,20 @@ def parse_price(price_str):
     if not price_str:
         return 0
     # Extract first number from string
-    match = re.search(r'(\d+)', price_str.replace(' ', ''))
+    match = _PRICE_RE.search(price_str.replace(' ', ''))
     if match:
         return int(match.group(1))
     return 0
 
+# Fallback formats for normalize_msk (fromisoformat handles the common cases)
+_MSK_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S%z",  # ISO with timezone
+    "%Y-%m-%dT%H:%M:%S.%f%z",  # ISO with microseconds and timezone
+    "%Y-%m-%dT%H:%M:%S",  # ISO without timezone
+    "%Y-%m-%dT%H:%M:%S.%f",  # ISO with microseconds without timezone
+    "%Y-%m-%d %H:%M:%S",  # Space separator
+)
+
 def normalize_msk(dt_str):
     """
     Normalize datetime string to MSK timezone (+03:00).
@@ -98,57 +188,225 @@ def normalize_msk(dt_str):
     
     # Parse string
     if isinstance(dt_str, str):
-        # Try parsing various formats
-        formats = [
-            "%Y-%m-%dT%H:%M:%S%z",  # ISO with timezone
-            "%Y-%m-%dT%H:%M:%S.%f%z",  # ISO with microseconds and timezone
-            "%Y-%m-%dT%H:%M:%S",  # ISO without timezone
-            "%Y-%m-%dT%H:%M:%S.%f",  # ISO with microseconds without timezone
-            "%Y-%m-%d %H:%M:%S",  # Space separator
-        ]
-        
+        return _parse_msk_str(dt_str)
+    
+    return None
+
+@lru_cache(maxsize=4096)
+def _parse_msk_str(dt_str):
+    """Parse datetime string to MSK. Memoized: main() and upsert_tournament parse the same starts_at."""
+    # Fast path: C-implemented ISO parser (also accepts space separator)
+    try:
+        dt = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+    except ValueError:
         dt = None
-        for fmt in formats:
+    
+    if dt is None:
+        # Fallback: formats older Python versions' fromisoformat does not accept
+        for fmt in _MSK_FORMATS:
             try:
                 dt = datetime.strptime(dt_str, fmt)
                 break
             except ValueError:
                 continue
-        
-        if dt is None:
-            # Fallback: try parsing with dateutil or return None
-            try:
-                dt = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
-            except:
-                print(f"WARNING: Could not parse datetime: {dt_str}")
-                return None
-        
-        # If timezone is missing, assume MSK
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=MSK_TZ)
+    
+    if dt is None:
+        print(f"WARNING: Could not parse datetime: {dt_str}")
+        return None
+    
+    # If timezone is missing, assume MSK
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=MSK_TZ)
+    else:
+        # Convert to MSK
+        dt = dt.astimezone(MSK_TZ)
+    
+    return dt
+
+# Errors raised by the JSON loader for malformed files
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson else (json.JSONDecodeError,)
+
+# Smaller files are parsed in one go (orjson if installed, else json.load):
+# faster than streaming, and memory is not a concern
+JSON_STREAM_MIN_BYTES = 10 * 1024 * 1024
+
+def open_lunda_json(json_path):
+    """
+    Open Lunda JSON for streaming. Tournaments are parsed one at a time with ijson
+    (orjson/json.load for files under JSON_STREAM_MIN_BYTES or if ijson is not installed).
+    Returns (global_last_updated, tournaments_type, tournaments_iter):
+    tournaments_type is 'dict', 'list', None (no 'tournaments' key) or another JSON type name.
+    """
+    if ijson is None or os.path.getsize(json_path) < JSON_STREAM_MIN_BYTES:
+        if orjson is not None:
+            with open(json_path, 'rb') as f:
+                data = orjson.loads(f.read())
         else:
-            # Convert to MSK
-            dt = dt.astimezone(MSK_TZ)
-        
-        return dt
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        tournaments_raw = data.get('tournaments')
+        if isinstance(tournaments_raw, dict):
+            tournaments_iter = iter(tournaments_raw.values())
+        elif isinstance(tournaments_raw, list):
+            tournaments_iter = iter(tournaments_raw)
+        else:
+            tournaments_iter = iter(())
+        tournaments_type = type(tournaments_raw).__name__ if tournaments_raw is not None else None
+        return data.get('last_updated'), tournaments_type, tournaments_iter
+    
+    # Pass 1: scan events (no objects built) for last_updated and the tournaments container type
+    global_last_updated = None
+    found_last_updated = False
+    tournaments_event = None
+    with open(json_path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == 'last_updated' and not found_last_updated:
+                global_last_updated = value
+                found_last_updated = True
+            elif prefix == 'tournaments' and tournaments_event is None:
+                tournaments_event = event
+            if found_last_updated and tournaments_event is not None:
+                break
     
-    return None
+    tournaments_type = {'start_map': 'dict', 'start_array': 'list', None: None}.get(tournaments_event, tournaments_event)
+    
+    # Pass 2: stream tournament objects
+    def iter_tournaments():
+        with open(json_path, 'rb') as f:
+            if tournaments_type == 'dict':
+                for _, tournament_data in ijson.kvitems(f, 'tournaments', use_float=True):
+                    yield tournament_data
+            elif tournaments_type == 'list':
+                yield from ijson.items(f, 'tournaments.item', use_float=True)
+    
+    return global_last_updated, tournaments_type, iter_tournaments()
+
+# Schema introspection cache: (table_name, column_name) -> bool.
+# Schema does not change during a run, so each column is probed at most once.
+_COLUMN_CACHE = {}
+# Tables whose full column list was loaded by preload_schema: uncached columns don't exist
+_PRELOADED_TABLES = set()
+
+def preload_schema(conn, tables=('tournaments', 'entries', 'players')):
+    """Load all columns of the import tables into the schema cache with one query."""
+    cur = shared_cursor(conn)
+    cur.execute("""
+        SELECT table_name, column_name FROM information_schema.columns 
+        WHERE table_name = ANY(%s)
+    """, (list(tables),))
+    for table_name, column_name in cur.fetchall():
+        _COLUMN_CACHE[(table_name, column_name)] = True
+    _PRELOADED_TABLES.update(tables)
 
 def check_column_exists(conn, table_name, column_name):
-    """Check if column exists in table."""
-    cur = conn.cursor()
+    """Check if column exists in table. Result is cached per process."""
+    key = (table_name, column_name)
+    if key in _COLUMN_CACHE:
+        return _COLUMN_CACHE[key]
+    if table_name in _PRELOADED_TABLES:
+        return False
+    
+    cur = shared_cursor(conn)
     cur.execute("""
         SELECT 1 FROM information_schema.columns 
         WHERE table_name = %s AND column_name = %s
     """, (table_name, column_name))
     exists = cur.fetchone() is not None
-    cur.close()
+    _COLUMN_CACHE[key] = exists
     return exists
 
-def upsert_tournament(conn, tournament_data, global_last_updated=None):
-    """UPSERT tournament by (location, starts_at). Returns (tournament_id, was_new)."""
-    cur = conn.cursor()
-    
+def check_columns_exist(conn, table_name, column_names):
+    """Return the subset of column_names present in table. Uncached columns are probed in one query."""
+    missing = [c for c in column_names if (table_name, c) not in _COLUMN_CACHE]
+    if table_name in _PRELOADED_TABLES:
+        missing = []
+    if missing:
+        cur = shared_cursor(conn)
+        cur.execute("""
+            SELECT column_name FROM information_schema.columns 
+            WHERE table_name = %s AND column_name = ANY(%s)
+        """, (table_name, missing))
+        found = {row[0] for row in cur.fetchall()}
+        for c in missing:
+            _COLUMN_CACHE[(table_name, c)] = c in found
+    return {c for c in column_names if _COLUMN_CACHE.get((table_name, c), False)}
+
+# Static SQL per schema variant, built once per process from the cached schema
+# so every call sends the same statement text
+_SQL_CACHE = {}
+
+def get_tournament_sql(conn):
+    """
+    Return {'bulk', 'bulk_template'} UPSERT SQL for tournaments matching the columns present in this DB.
+    Requires unique index on tournaments(location, starts_at) (migration 014).
+    """
+    if 'tournaments' in _SQL_CACHE:
+        return _SQL_CACHE['tournaments']
+    
+    columns = check_columns_exist(conn, 'tournaments', ('active', 'archived_at', 'first_seen_in_source', 'last_seen_in_source', 'source'))
+    has_active = 'active' in columns
+    has_archived_at = 'archived_at' in columns
+    has_first_seen = 'first_seen_in_source' in columns
+    has_last_seen = 'last_seen_in_source' in columns
+    has_source = 'source' in columns
+    
+    # Existing tournament: update fields but preserve first_seen_in_source
+    # Always set last_seen_in_source = NOW() and archived_at = NULL when tournament is seen in JSON
+    update_fields = [
+        "ends_at = EXCLUDED.ends_at",
+        "organizer = EXCLUDED.organizer",
+        "title = EXCLUDED.title",
+        "price_rub = EXCLUDED.price_rub",
+        "source_last_updated = EXCLUDED.source_last_updated",
+        "tournament_type = EXCLUDED.tournament_type"
+    ]
+    if has_last_seen:
+        update_fields.append("last_seen_in_source = NOW()")
+    if has_archived_at:
+        update_fields.append("archived_at = NULL")
+    if has_active:
+        update_fields.append("active = true")
+    if has_source:
+        update_fields.append("source = 'lunda'")
+    
+    # New tournament: create with all timestamps
+    # Params: location, starts_at, ends_at, organizer, title, price_rub, source_last_updated, tournament_type
+    insert_fields = ["location", "starts_at", "ends_at", "organizer", "title", "price_rub", "source_last_updated", "tournament_type"]
+    placeholders = ["%s"] * len(insert_fields)
+    if has_first_seen:
+        insert_fields.append("first_seen_in_source")
+        placeholders.append("NOW()")
+    if has_last_seen:
+        insert_fields.append("last_seen_in_source")
+        placeholders.append("NOW()")
+    if has_archived_at:
+        insert_fields.append("archived_at")
+        placeholders.append("NULL")
+    if has_active:
+        insert_fields.append("active")
+        placeholders.append("true")
+    if has_source:
+        insert_fields.append("source")
+        placeholders.append("'lunda'")
+    
+    sql = {
+        'bulk': f"""
+            INSERT INTO tournaments ({', '.join(insert_fields)})
+            VALUES %s
+            ON CONFLICT (location, starts_at) DO UPDATE
+            SET {', '.join(update_fields)}
+            RETURNING id, location, starts_at, (xmax = 0) AS was_new
+        """,
+        'bulk_template': f"({', '.join(placeholders)})",
+    }
+    _SQL_CACHE['tournaments'] = sql
+    return sql
+
+def tournament_row(tournament_data, global_last_updated=None):
+    """
+    Extract tournament columns from JSON:
+    (location, starts_at, ends_at, organizer, title, price_rub, source_last_updated, tournament_type).
+    """
     # Extract tournament info from nested structure
     tournament_info = tournament_data.get('tournament', {})
     
@@ -170,105 +428,47 @@ def upsert_tournament(conn, tournament_data, global_last_updated=None):
     if tournament_type not in ['personal', 'team']:
         tournament_type = 'personal'  # Default to personal if not specified or invalid
     
-    # Log tournament import
-    print(f"IMPORT TOURNAMENT: title={title}, location={location}, starts_at={starts_at} (MSK), type={tournament_type}")
-    
-    # Check if new columns exist
-    has_active = check_column_exists(conn, 'tournaments', 'active')
-    has_archived_at = check_column_exists(conn, 'tournaments', 'archived_at')
-    has_first_seen = check_column_exists(conn, 'tournaments', 'first_seen_in_source')
-    has_last_seen = check_column_exists(conn, 'tournaments', 'last_seen_in_source')
-    has_source = check_column_exists(conn, 'tournaments', 'source')
-    
-    # Check if tournament exists (compare as timestamptz)
-    # Note: PostgreSQL will compare timestamptz correctly even if timezone differs
-    cur.execute("""
-        SELECT id FROM tournaments 
-        WHERE location = %s AND starts_at = %s::timestamptz
-    """, (location, starts_at))
-    
-    existing = cur.fetchone()
+    return (location, starts_at, ends_at, organizer, title, price_rub, source_last_updated, tournament_type)
+
+def bulk_upsert_tournaments(conn, tournaments, global_last_updated=None):
+    """
+    UPSERT many tournaments by (location, starts_at) in one statement.
+    Returns list of (tournament_id, was_new) aligned with tournaments; a tournament repeated
+    in the list is only was_new on its first occurrence. Does not commit.
+    """
+    rows_by_key = {}
+    keys = []
+    for tournament_data in tournaments:
+        row = tournament_row(tournament_data, global_last_updated)
+        location, starts_at, _, _, title, _, _, tournament_type = row
+        # Log tournament import
+        print(f"IMPORT TOURNAMENT: title={title}, location={location}, starts_at={starts_at} (MSK), type={tournament_type}")
+        # ON CONFLICT DO UPDATE cannot touch the same row twice: last occurrence wins
+        rows_by_key[(location, starts_at)] = row
+        keys.append((location, starts_at))
+    if not keys:
+        return []
     
-    if existing:
-        # Tournament exists - update fields but preserve first_seen_in_source
-        tournament_id = existing[0]
-        
-        # Build UPDATE query dynamically based on available columns
-        update_fields = [
-            "ends_at = %s",
-            "organizer = %s",
-            "title = %s",
-            "price_rub = %s",
-            "source_last_updated = %s",
-            "tournament_type = %s"
-        ]
-        update_values = [ends_at, organizer, title, price_rub, source_last_updated, tournament_type]
-        
-        # Always set last_seen_in_source = NOW() and archived_at = NULL when tournament is seen in JSON
-        if has_last_seen:
-            update_fields.append("last_seen_in_source = NOW()")
-        if has_archived_at:
-            update_fields.append("archived_at = NULL")
-        if has_active:
-            update_fields.append("active = true")
-        if has_source:
-            update_fields.append("source = 'lunda'")
-        
-        update_query = f"""
-            UPDATE tournaments
-            SET {', '.join(update_fields)}
-            WHERE id = %s
-        """
-        update_values.append(tournament_id)
-        
-        cur.execute(update_query, tuple(update_values))
-        conn.commit()
-        return (tournament_id, False)
-    else:
-        # New tournament - create with all timestamps
-        insert_fields = ["location", "starts_at", "ends_at", "organizer", "title", "price_rub", "source_last_updated", "tournament_type"]
-        insert_values = [location, starts_at, ends_at, organizer, title, price_rub, source_last_updated, tournament_type]
-        insert_placeholders = ["%s"] * len(insert_fields)
-        
-        # Always set timestamps for new tournaments
-        if has_first_seen:
-            insert_fields.append("first_seen_in_source")
-            insert_values.append("NOW()")
-        if has_last_seen:
-            insert_fields.append("last_seen_in_source")
-            insert_values.append("NOW()")
-        if has_archived_at:
-            insert_fields.append("archived_at")
-            insert_values.append(None)  # Explicitly NULL for new tournaments
-        if has_active:
-            insert_fields.append("active")
-            insert_values.append(True)
-        if has_source:
-            insert_fields.append("source")
-            insert_values.append("lunda")
-        
-        # Build placeholders and values separately
-        placeholders = []
-        sql_values = []
-        for val in insert_values:
-            if val == "NOW()":
-                placeholders.append("NOW()")
-            elif val is None:
-                placeholders.append("NULL")
-            else:
-                placeholders.append("%s")
-                sql_values.append(val)
-        
-        insert_query = f"""
-            INSERT INTO tournaments ({', '.join(insert_fields)})
-            VALUES ({', '.join(placeholders)})
-            RETURNING id
-        """
-        
-        cur.execute(insert_query, tuple(sql_values))
-        tournament_id = cur.fetchone()[0]
-        conn.commit()
-        return (tournament_id, True)
+    sql = get_tournament_sql(conn)
+    cur = shared_cursor(conn)
+    returned = execute_values(
+        cur, sql['bulk'], list(rows_by_key.values()),
+        template=sql['bulk_template'], page_size=500, fetch=True
+    )
+    # Map back by key (timestamptz compares equal across time zones)
+    upserted = {(location, starts_at): (tournament_id, was_new) for tournament_id, location, starts_at, was_new in returned}
+    
+    result = []
+    seen = set()
+    for key in keys:
+        tournament_id, was_new = upserted[key]
+        result.append((tournament_id, was_new and key not in seen))
+        seen.add(key)
+    return result
+
+def upsert_tournament(conn, tournament_data, global_last_updated=None):
+    """UPSERT tournament by (location, starts_at). Returns (tournament_id, was_new). Does not commit."""
+    return bulk_upsert_tournaments(conn, [tournament_data], global_last_updated)[0]
 
 def get_levenshtein_threshold(normalized_name_len):
     """
@@ -310,92 +510,265 @@ def calculate_candidate_score(full_dist, surname_dist, name_dist):
     name_score = name_dist * 3 if name_dist is not None else 0
     return full_dist * 10 + surname_score + name_score
 
-def levenshtein_distance(cur, str1, str2):
+@lru_cache(maxsize=16384)
+def levenshtein_distance(str1, str2):
     """
-    Calculate Levenshtein distance using PostgreSQL function.
-    Returns distance or None on error.
+    Calculate Levenshtein distance in-process (rapidfuzz if installed).
+    Returns distance or None if either string is empty.
+    Memoized: surname/name token pairs repeat across candidates and tournaments.
     """
     if not str1 or not str2:
         return None
-    try:
-        cur.execute("SELECT levenshtein(%s::text, %s::text)", (str1, str2))
-        row = cur.fetchone()
-        return row[0] if row else None
-    except:
-        return None
+    if _Levenshtein is not None:
+        return _Levenshtein.distance(str1, str2)
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+    prev = list(range(len(str2) + 1))
+    for i, c1 in enumerate(str1, 1):
+        cur = [i]
+        for j, c2 in enumerate(str2, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (c1 != c2)))
+        prev = cur
+    return prev[-1]
+
+def _passes_extra_heuristics(input_surname, candidate_surname, surname_dist, name_dist):
+    """
+    Heuristics 2-4: name within 1 edit and surname either within 1 edit,
+    missing its first letter, or differing only in the first letter.
+    """
+    if name_dist is None or name_dist > 1:
+        return False
+    # Heuristic 2: Surname and name separately
+    if surname_dist is not None and surname_dist <= 1:
+        return True
+    # Heuristics 3-4: Missing first letter of surname / first letter differs but rest matches
+    if input_surname and candidate_surname and len(input_surname) > 1 and len(candidate_surname) > 1:
+        input_tail = input_surname[1:]
+        candidate_tail = candidate_surname[1:]
+        return (input_tail == candidate_surname
+                or candidate_tail == input_surname
+                or input_tail == candidate_tail)
+    return False
 
-def passes_similarity_filter(cur, input_norm, input_surname, input_name, candidate_norm, candidate_surname, candidate_name, full_dist, max_dist):
+def passes_similarity_filter(input_norm, input_surname, input_name, candidate_norm, candidate_surname, candidate_name, full_dist, max_dist):
     """
     Check if candidate passes similarity filter using multiple heuristics.
     Returns: (passes: bool, surname_dist: int, name_dist: int)
     """
-    # Calculate surname and name distances
+    # Calculate surname and name distances (in-process, no DB round trips)
     surname_dist = None
     name_dist = None
     
     if input_surname and candidate_surname:
-        surname_dist = levenshtein_distance(cur, input_surname, candidate_surname)
+        surname_dist = levenshtein_distance(input_surname, candidate_surname)
     
     if input_name and candidate_name:
-        name_dist = levenshtein_distance(cur, input_name, candidate_name)
+        name_dist = levenshtein_distance(input_name, candidate_name)
     
     # Heuristic 1: Full name Levenshtein within max_dist
     if full_dist <= max_dist:
-        # Heuristic 2: Surname and name separately
-        if surname_dist is not None and name_dist is not None:
-            if surname_dist <= 1 and name_dist <= 1:
-                return (True, surname_dist, name_dist)
-        
-        # Heuristic 3: Missing first letter of surname
-        if input_surname and candidate_surname:
-            if len(input_surname) > 1 and len(candidate_surname) > 1:
-                if input_surname[1:] == candidate_surname or candidate_surname[1:] == input_surname:
-                    if name_dist is not None and name_dist <= 1:
-                        return (True, surname_dist or 0, name_dist)
-        
-        # Heuristic 4: First letter differs but rest matches
-        if input_surname and candidate_surname:
-            if len(input_surname) > 1 and len(candidate_surname) > 1:
-                if input_surname[1:] == candidate_surname[1:]:
-                    if name_dist is not None and name_dist <= 1:
-                        return (True, surname_dist or 0, name_dist)
-        
-        # Default: pass if full_dist <= max_dist
         return (True, surname_dist, name_dist)
     
-    # Heuristic 5: Allow slightly beyond max_dist if other heuristics pass
-    if full_dist <= max_dist + 2:
-        # Check heuristics 2-4 even if full_dist is slightly higher
-        if surname_dist is not None and name_dist is not None:
-            if surname_dist <= 1 and name_dist <= 1:
-                return (True, surname_dist, name_dist)
-        
-        if input_surname and candidate_surname:
-            if len(input_surname) > 1 and len(candidate_surname) > 1:
-                if input_surname[1:] == candidate_surname or candidate_surname[1:] == input_surname:
-                    if name_dist is not None and name_dist <= 1:
-                        return (True, surname_dist or 0, name_dist)
-                if input_surname[1:] == candidate_surname[1:]:
-                    if name_dist is not None and name_dist <= 1:
-                        return (True, surname_dist or 0, name_dist)
+    # Heuristic 5: Allow slightly beyond max_dist if heuristics 2-4 pass
+    if full_dist <= max_dist + 2 and _passes_extra_heuristics(input_surname, candidate_surname, surname_dist, name_dist):
+        return (True, surname_dist, name_dist)
     
     return (False, None, None)
 
-def resolve_player_id(conn, input_full_name, sync_run_id, tournament_id):
+# Exact-match maps loaded once per run by preload_player_maps:
+# normalized_alias -> player_id and full_name -> player_id.
+# Players created during the run are added by register_player once committed;
+# names missing here fall back to SQL lookups.
+_ALIAS_MAP = {}
+_NAME_MAP = {}
+# In-memory fuzzy pool source (rapidfuzz only): ([id], [full_name], [normalized_name]).
+# None = not loaded, pools come from SQL. Replaced copy-on-write under the lock,
+# so workers read a consistent snapshot without locking.
+_PLAYER_INDEX = None
+_PLAYER_INDEX_LOCK = threading.Lock()
+
+def preload_player_maps(conn):
+    """Load all player aliases and players into the in-process maps with two queries."""
+    global _PLAYER_INDEX
+    cur = shared_cursor(conn)
+    cur.execute("SELECT normalized_alias, player_id FROM player_aliases")
+    aliases = dict(cur.fetchall())
+    cur.execute("SELECT full_name, id, normalized_name FROM players")
+    players = cur.fetchall()
+    _ALIAS_MAP.clear()
+    _ALIAS_MAP.update(aliases)
+    _NAME_MAP.clear()
+    _NAME_MAP.update((full_name, player_id) for full_name, player_id, _ in players)
+    if _rf_process is not None:
+        indexed = [p for p in players if p[2]]
+        with _PLAYER_INDEX_LOCK:
+            _PLAYER_INDEX = (
+                [p[1] for p in indexed],
+                [p[0] for p in indexed],
+                [p[2] for p in indexed],
+            )
+    return len(aliases), len(players)
+
+def register_player(player_id, full_name):
+    """Add a committed new player to the in-process maps (run after the commit that created it)."""
+    global _PLAYER_INDEX
+    _NAME_MAP[full_name] = player_id
+    with _PLAYER_INDEX_LOCK:
+        if _PLAYER_INDEX is not None:
+            ids, names, norms = _PLAYER_INDEX
+            _PLAYER_INDEX = (ids + [player_id], names + [full_name], norms + [normalize_name(full_name)])
+
+def fuzzy_pool_in_memory(normalized_name, max_dist, limit_pool):
+    """
+    TOP limit_pool (id, full_name, normalized_name, dist) rows with dist <= max_dist
+    from the in-memory player index, sorted by (dist, id).
+    Same pool as the SQL queries in resolve_players_bulk/find_candidate_players
+    (length window + levenshtein_less_equal, ORDER BY dist, id), whose rows beyond
+    max_dist are dropped by find_candidate_players anyway.
+    """
+    ids, names, norms = _PLAYER_INDEX
+    # No limit here: ties at the limit are broken by id below, as in SQL
+    matches = _rf_process.extract(
+        normalized_name, norms,
+        scorer=_Levenshtein.distance, limit=None, score_cutoff=max_dist
+    )
+    matches.sort(key=lambda m: (m[1], ids[m[2]]))
+    return [(ids[i], names[i], candidate_norm, dist) for candidate_norm, dist, i in matches[:limit_pool]]
+
+def resolve_players_bulk(conn, raw_names, limit_pool=30):
+    """
+    Prefetch resolution data for all participants of a tournament in 3 queries
+    (aliases, exact full_name matches, fuzzy pools) instead of 3 queries per name.
+    Names found in the preloaded maps skip the alias/exact queries entirely.
+    
+    Returns dict raw_name -> (player_id, hit_kind, pool_rows):
+    - (player_id, "alias"/"exact", None) if alias/exact found
+    - (None, None, pool_rows) otherwise; pool_rows are (id, full_name, normalized_name, dist)
+      sorted by dist, ready for find_candidate_players
+    """
+    names = [n for n in dict.fromkeys(raw_names) if n]
+    if not names:
+        return {}
+    
+    norms = {name: normalize_name(name) for name in names}
+    result = {}
+    cur = shared_cursor(conn)
+    
+    # 0. Preloaded maps; only misses go to the database
+    lookup_names = []
+    for name in names:
+        norm = norms[name]
+        if norm in _ALIAS_MAP:
+            result[name] = (_ALIAS_MAP[norm], "alias", None)
+        elif name in _NAME_MAP:
+            result[name] = (_NAME_MAP[name], "exact", None)
+        else:
+            lookup_names.append(name)
+    
+    alias_map = {}
+    exact_map = {}
+    if lookup_names:
+        # 1. Aliases by normalized name
+        cur.execute("""
+            SELECT normalized_alias, player_id FROM player_aliases
+            WHERE normalized_alias = ANY(%s)
+        """, (list({norms[name] for name in lookup_names}),))
+        alias_map = dict(cur.fetchall())
+        
+        # 2. Exact matches by full_name (case-sensitive)
+        cur.execute("""
+            SELECT full_name, id FROM players
+            WHERE full_name = ANY(%s)
+        """, (lookup_names,))
+        exact_map = dict(cur.fetchall())
+    
+    unresolved_norms = set()
+    for name in lookup_names:
+        norm = norms[name]
+        if norm in alias_map:
+            result[name] = (alias_map[norm], "alias", None)
+        elif name in exact_map:
+            result[name] = (exact_map[name], "exact", None)
+        elif norm:
+            unresolved_norms.add(norm)
+    
+    # 3. Fuzzy pools (TOP limit_pool by full Levenshtein) for unresolved names only
+    # Candidates beyond threshold + 2 are dropped by find_candidate_players anyway
+    pools = {norm: [] for norm in unresolved_norms}
+    if unresolved_norms and _PLAYER_INDEX is not None:
+        pools = {
+            norm: fuzzy_pool_in_memory(norm, get_levenshtein_threshold(len(norm)) + 2, limit_pool)
+            for norm in unresolved_norms
+        }
+    elif unresolved_norms:
+        norm_list = list(unresolved_norms)
+        bounds = [get_levenshtein_threshold(len(n)) + 2 for n in norm_list]
+        cur.execute("SAVEPOINT fuzzy_pool")
+        try:
+            cur.execute("""
+                SELECT q.n, p.id, p.full_name, p.normalized_name, p.dist
+                FROM unnest(%s::text[], %s::int[]) AS q(n, max_dist)
+                CROSS JOIN LATERAL (
+                    SELECT id, full_name, normalized_name,
+                           levenshtein_less_equal(normalized_name, q.n, q.max_dist) AS dist
+                    FROM players
+                    WHERE normalized_name IS NOT NULL
+                      AND length(normalized_name) BETWEEN length(q.n) - q.max_dist AND length(q.n) + q.max_dist
+                    ORDER BY dist ASC, id ASC
+                    LIMIT %s
+                ) p
+            """, (norm_list, bounds, limit_pool))
+            for norm, *row in cur.fetchall():
+                pools[norm].append(tuple(row))
+            cur.execute("RELEASE SAVEPOINT fuzzy_pool")
+        except psycopg2.Error as e:
+            # Keep the transaction usable; find_candidate_players will retry per name
+            # and handle a missing levenshtein() the usual way
+            cur.execute("ROLLBACK TO SAVEPOINT fuzzy_pool")
+            print(f"FUZZY MATCH: bulk pool query failed, falling back to per-name lookup: {e}")
+            pools = {}
+        for rows in pools.values():
+            rows.sort(key=lambda r: (r[3], r[0]))
+    
+    for name in names:
+        if name not in result:
+            result[name] = (None, None, pools.get(norms[name]))
+    
+    return result
+
+def resolve_player_id(conn, input_full_name, sync_run_id, tournament_id, prefetched=None):
     """
     Unified function to resolve player_id from input name.
     Order: alias -> exact -> fuzzy -> new
     
-    Returns:
-    - (player_id, "resolved") if alias/exact found
-    - (None, "pending_created") if pending created (has candidates <= threshold)
-    - (new_player_id, "new_player_created") if new player created automatically (no candidates)
+    prefetched: optional (player_id, hit_kind, pool_rows) from resolve_players_bulk,
+    used instead of per-name queries.
+    
+    Returns (player_id, status, pending):
+    - (player_id, "resolved", None) if alias/exact found
+    - (None, "pending_created", (pending_id, candidates)) if pending created (has candidates <= threshold)
+    - (new_player_id, "new_player_created", None) if new player created automatically (no candidates)
     """
     if not input_full_name:
-        return (None, None)
+        return (None, None, None)
     
     norm = normalize_name(input_full_name)
-    cur = conn.cursor()
+    
+    if prefetched is not None:
+        player_id, hit_kind, pool_rows = prefetched
+        if player_id is not None:
+            print(f"RESOLVE: {hit_kind}_hit '{input_full_name}' -> player_id={player_id}")
+            return (player_id, "resolved", None)
+        return _resolve_fuzzy_or_new(conn, input_full_name, norm, sync_run_id, tournament_id, pool_rows)
+    
+    if norm in _ALIAS_MAP:
+        print(f"RESOLVE: alias_hit '{input_full_name}' -> player_id={_ALIAS_MAP[norm]}")
+        return (_ALIAS_MAP[norm], "resolved", None)
+    if input_full_name in _NAME_MAP:
+        print(f"RESOLVE: exact_hit '{input_full_name}' -> player_id={_NAME_MAP[input_full_name]}")
+        return (_NAME_MAP[input_full_name], "resolved", None)
+    
+    cur = shared_cursor(conn)
     
     # 1. Try alias first (normalized_alias)
     cur.execute("""
@@ -405,9 +778,8 @@ def resolve_player_id(conn, input_full_name, sync_run_id, tournament_id):
     """, (norm,))
     row = cur.fetchone()
     if row:
-        cur.close()
         print(f"RESOLVE: alias_hit '{input_full_name}' -> player_id={row[0]}")
-        return (row[0], "resolved")
+        return (row[0], "resolved", None)
     
     # 2. Try exact match by full_name (case-sensitive)
     cur.execute("""
@@ -417,13 +789,15 @@ def resolve_player_id(conn, input_full_name, sync_run_id, tournament_id):
     """, (input_full_name,))
     row = cur.fetchone()
     if row:
-        cur.close()
         print(f"RESOLVE: exact_hit '{input_full_name}' -> player_id={row[0]}")
-        return (row[0], "resolved")
+        return (row[0], "resolved", None)
     
+    return _resolve_fuzzy_or_new(conn, input_full_name, norm, sync_run_id, tournament_id)
+
+def _resolve_fuzzy_or_new(conn, input_full_name, norm, sync_run_id, tournament_id, pool_rows=None):
+    """Fuzzy step of resolve_player_id: create pending entry or new player."""
     # 3. Find candidates using fuzzy matching
-    cur.close()
-    candidates = find_candidate_players(conn, input_full_name, norm, limit_display=5, limit_pool=30)
+    candidates = find_candidate_players(conn, input_full_name, norm, limit_display=5, limit_pool=30, pool_rows=pool_rows)
     
     # Filter candidates: exclude any where full_name == input_full_name
     filtered_candidates = [c for c in candidates if c.get('name') != input_full_name]
@@ -456,28 +830,31 @@ def resolve_player_id(conn, input_full_name, sync_run_id, tournament_id):
         
         if pending_id:
             print(f"RESOLVE: fuzzy_pending '{input_full_name}' -> {len(top_candidates)} candidates (threshold={threshold}), pending_id={pending_id}")
-            return (None, "pending_created")
+            return (None, "pending_created", (pending_id, top_candidates))
         else:
             # Fallback: if pending creation failed, treat as new player
             print(f"RESOLVE: fuzzy_pending FAILED, falling back to new_player '{input_full_name}'")
             new_player_id = upsert_player(conn, input_full_name)
-            return (new_player_id, "new_player_created")
+            return (new_player_id, "new_player_created", None)
     else:
         # No candidates within threshold -> create new player automatically
         print(f"RESOLVE: new_player '{input_full_name}' (no candidates within threshold={threshold})")
         new_player_id = upsert_player(conn, input_full_name)
-        return (new_player_id, "new_player_created")
+        return (new_player_id, "new_player_created", None)
 
-def find_candidate_players(conn, raw_name, normalized_name, limit_display=3, limit_pool=30):
+def find_candidate_players(conn, raw_name, normalized_name, limit_display=3, limit_pool=30, pool_rows=None):
     """
     Find candidate players with improved filtering and scoring.
     Returns list of {player_id, name, dist, score, surname_dist, name_dist}.
     Only returns candidates that pass similarity filter.
+    pool_rows: optional prefetched (id, full_name, normalized_name, dist) rows
+    (see resolve_players_bulk); queried from DB if None.
+    Surname/name distances are computed in-process, so filtering costs no round trips.
     """
     if not normalized_name:
         return []
     
-    cur = conn.cursor()
+    cur = shared_cursor(conn)
     candidates = []
     max_dist = get_levenshtein_threshold(len(normalized_name))
     
@@ -485,16 +862,23 @@ def find_candidate_players(conn, raw_name, normalized_name, limit_display=3, lim
     input_surname, input_name = split_name_tokens(normalized_name)
     
     try:
-        # Get expanded pool from DB (TOP 30 by full Levenshtein)
-        cur.execute("""
-            SELECT id, full_name, normalized_name,
-                   levenshtein(normalized_name, %s::text) AS dist
-            FROM players
-            WHERE normalized_name IS NOT NULL
-            ORDER BY dist ASC
-            LIMIT %s
-        """, (normalized_name, limit_pool))
-        pool_rows = cur.fetchall()
+        # Get expanded pool from DB (TOP 30 by full Levenshtein).
+        # levenshtein_less_equal stops at max_dist + 2: farther rows all tie at bound + 1
+        # and are skipped below, so the ordering of closer rows is unchanged. The length
+        # window drops rows up front: distance is at least the length difference.
+        if pool_rows is None:
+            cur.execute("""
+                SELECT id, full_name, normalized_name,
+                       levenshtein_less_equal(normalized_name, %(norm)s::text, %(bound)s) AS dist
+                FROM players
+                WHERE normalized_name IS NOT NULL
+                  AND length(normalized_name) BETWEEN %(len_min)s AND %(len_max)s
+                ORDER BY dist ASC, id ASC
+                LIMIT %(limit)s
+            """, {'norm': normalized_name, 'limit': limit_pool, 'bound': max_dist + 2,
+                  'len_min': len(normalized_name) - max_dist - 2,
+                  'len_max': len(normalized_name) + max_dist + 2})
+            pool_rows = cur.fetchall()
         
         print(f"FUZZY MATCH: input=\"{raw_name}\", max_dist={max_dist}, pool_size={len(pool_rows)}")
         
@@ -520,7 +904,7 @@ def find_candidate_players(conn, raw_name, normalized_name, limit_display=3, lim
             
             # Check if passes similarity filter
             passes, surname_dist, name_dist = passes_similarity_filter(
-                cur, normalized_name, input_surname, input_name,
+                normalized_name, input_surname, input_name,
                 candidate_norm, candidate_surname, candidate_name,
                 full_dist, max_dist
             )
@@ -573,23 +957,18 @@ def find_candidate_players(conn, raw_name, normalized_name, limit_display=3, lim
             # Re-raise if it's a different error
             raise
     
-    cur.close()
     return candidates
 
 def upsert_player(conn, full_name):
     """
     UPSERT player by full_name.
     Also updates normalized_name if missing.
-    Returns player_id.
+    Returns player_id. Does not commit - caller owns the transaction.
     """
-    cur = conn.cursor()
+    cur = shared_cursor(conn)
     
     # Check if normalized_name column exists
-    cur.execute("""
-        SELECT column_name FROM information_schema.columns 
-        WHERE table_name = 'players' AND column_name = 'normalized_name'
-    """)
-    has_normalized = cur.fetchone() is not None
+    has_normalized = check_column_exists(conn, 'players', 'normalized_name')
     
     norm = normalize_name(full_name) if has_normalized else None
     
@@ -625,18 +1004,79 @@ def upsert_player(conn, full_name):
                 WHERE id = %s AND normalized_name IS NULL
             """, (norm, player_id))
     
-    conn.commit()
-    cur.close()
     return player_id
 
+def get_entry_sql(conn):
+    """
+    Return {'update', 'insert', 'bulk', 'merge_staged'} SQL for entries
+    matching the columns present in this DB. 'update' is None if there is nothing to update.
+    """
+    if 'entries' in _SQL_CACHE:
+        return _SQL_CACHE['entries']
+    
+    columns = check_columns_exist(conn, 'entries', ('active', 'first_seen_in_source', 'last_seen_in_source'))
+    has_entry_active = 'active' in columns
+    has_first_seen = 'first_seen_in_source' in columns
+    has_last_seen = 'last_seen_in_source' in columns
+    
+    # New entries: payment_status='pending', active=true, both timestamps = now()
+    # Existing entries: active=true, last_seen_in_source=now() (first_seen_in_source untouched)
+    insert_fields = ["tournament_id", "player_id", "payment_status"]
+    placeholders = ["%s", "%s", "'pending'"]
+    update_fields = []
+    if has_entry_active:
+        insert_fields.append("active")
+        placeholders.append("true")
+        update_fields.append("active = true")
+    if has_first_seen:
+        insert_fields.append("first_seen_in_source")
+        placeholders.append("NOW()")
+    if has_last_seen:
+        insert_fields.append("last_seen_in_source")
+        placeholders.append("NOW()")
+        update_fields.append("last_seen_in_source = NOW()")
+    
+    # No-op update so RETURNING still reports existing rows in the bulk upsert
+    bulk_update_fields = update_fields or ["tournament_id = EXCLUDED.tournament_id"]
+    unnest_values = ["%s", "u.player_id"] + placeholders[2:]
+    staged_values = ["s.tournament_id", "s.player_id"] + placeholders[2:]
+    
+    sql = {
+        'update': f"""
+            UPDATE entries
+            SET {', '.join(update_fields)}
+            WHERE id = %s
+        """ if update_fields else None,
+        'insert': f"""
+            INSERT INTO entries ({', '.join(insert_fields)})
+            VALUES ({', '.join(placeholders)})
+            RETURNING id
+        """,
+        # Params: tournament_id, player_ids array (two bind params for any row count)
+        'bulk': f"""
+            INSERT INTO entries ({', '.join(insert_fields)})
+            SELECT {', '.join(unnest_values)}
+            FROM unnest(%s::bigint[]) AS u(player_id)
+            ON CONFLICT (tournament_id, player_id) DO UPDATE
+            SET {', '.join(bulk_update_fields)}
+            RETURNING id, (xmax = 0) AS was_new
+        """,
+        'merge_staged': f"""
+            INSERT INTO entries ({', '.join(insert_fields)})
+            SELECT {', '.join(staged_values)}
+            FROM stage_entries s
+            ON CONFLICT (tournament_id, player_id) DO UPDATE
+            SET {', '.join(bulk_update_fields)}
+            RETURNING id, (xmax = 0) AS was_new
+        """,
+    }
+    _SQL_CACHE['entries'] = sql
+    return sql
+
 def upsert_entry(conn, tournament_id, player_id):
-    """UPSERT entry by (tournament_id, player_id). Returns (entry_id, was_new)."""
-    cur = conn.cursor()
-    
-    # Check if new columns exist
-    has_entry_active = check_column_exists(conn, 'entries', 'active')
-    has_first_seen = check_column_exists(conn, 'entries', 'first_seen_in_source')
-    has_last_seen = check_column_exists(conn, 'entries', 'last_seen_in_source')
+    """UPSERT entry by (tournament_id, player_id). Returns (entry_id, was_new). Does not commit."""
+    cur = shared_cursor(conn)
+    sql = get_entry_sql(conn)
     
     # Check if entry exists
     cur.execute("""
@@ -650,59 +1090,56 @@ def upsert_entry(conn, tournament_id, player_id):
     if existing:
         # Entry exists - update active and last_seen_in_source (don't touch first_seen_in_source)
         entry_id = existing[0]
-        
-        # Build UPDATE query dynamically
-        update_fields = []
-        if has_entry_active:
-            update_fields.append("active = true")
-        if has_last_seen:
-            update_fields.append("last_seen_in_source = NOW()")
-        
-        if update_fields:
-            update_query = f"""
-                UPDATE entries
-                SET {', '.join(update_fields)}
-                WHERE id = %s
-            """
-            cur.execute(update_query, (entry_id,))
-        conn.commit()
+        if sql['update']:
+            cur.execute(sql['update'], (entry_id,))
         return (entry_id, False)
     else:
         # New entry - create with payment_status='pending', active=true, both timestamps = now()
-        insert_fields = ["tournament_id", "player_id", "payment_status"]
-        insert_values = [tournament_id, player_id, 'pending']
-        placeholders = ["%s", "%s", "%s"]
-        
-        if has_entry_active:
-            insert_fields.append("active")
-            insert_values.append(True)
-            placeholders.append("%s")
-        if has_first_seen:
-            insert_fields.append("first_seen_in_source")
-            placeholders.append("NOW()")
-        if has_last_seen:
-            insert_fields.append("last_seen_in_source")
-            placeholders.append("NOW()")
-        
-        insert_query = f"""
-            INSERT INTO entries ({', '.join(insert_fields)})
-            VALUES ({', '.join(placeholders)})
-            RETURNING id
-        """
-        
-        cur.execute(insert_query, tuple(insert_values))
+        cur.execute(sql['insert'], (tournament_id, player_id))
         entry_id = cur.fetchone()[0]
-        conn.commit()
         return (entry_id, True)
 
+# Row count from which bulk upserts go through COPY + staging table instead of unnest()
+COPY_MIN_ROWS = 500
+
+def bulk_upsert_entries(conn, tournament_id, player_ids):
+    """
+    UPSERT entries for all player_ids of a tournament in one statement.
+    Requires unique index on entries(tournament_id, player_id) (migration 010).
+    Returns list of (entry_id, was_new).
+    """
+    # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement
+    player_ids = list(dict.fromkeys(player_ids))
+    if not player_ids:
+        return []
+    
+    sql = get_entry_sql(conn)
+    cur = shared_cursor(conn)
+    if len(player_ids) >= COPY_MIN_ROWS:
+        # Large sets: COPY into a temp staging table, then merge with one INSERT ... SELECT
+        cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS stage_entries (
+                tournament_id BIGINT NOT NULL,
+                player_id BIGINT NOT NULL
+            ) ON COMMIT DELETE ROWS
+        """)
+        cur.execute("TRUNCATE stage_entries")
+        buf = io.StringIO("".join(f"{tournament_id}\t{player_id}\n" for player_id in player_ids))
+        cur.copy_expert("COPY stage_entries (tournament_id, player_id) FROM STDIN", buf)
+        cur.execute(sql['merge_staged'])
+        rows = cur.fetchall()
+    else:
+        cur.execute(sql['bulk'], (tournament_id, player_ids))
+        rows = cur.fetchall()
+    return rows
+
 def create_pending_entry(conn, sync_run_id, tournament_id, raw_player_name, normalized_name, payload, candidates):
     """
     Create or update pending_entry with unique constraint.
-    Uses ON CONFLICT to handle duplicates based on (tournament_id, normalized_name, status='pending').
-    Returns pending_entry_id.
+    Uses a savepoint to handle duplicates based on (tournament_id, normalized_name, status='pending').
+    Returns pending_entry_id. Does not commit - caller owns the transaction.
     """
-    cur = conn.cursor()
-    from psycopg2.extras import Json
+    cur = shared_cursor(conn)
     
     # Try to find existing pending entry with status='pending'
     cur.execute("""
@@ -726,10 +1163,12 @@ def create_pending_entry(conn, sync_run_id, tournament_id, raw_player_name, norm
                 sync_run_id = %s,
                 created_at = NOW()
             WHERE id = %s
-        """, (Json(candidates), raw_player_name, Json(payload), sync_run_id, pending_id))
+        """, (Json(candidates, dumps=_JSON_DUMPS), raw_player_name, Json(payload, dumps=_JSON_DUMPS), sync_run_id, pending_id))
     else:
         # Create new pending entry
         # Unique index ensures no duplicates (tournament_id + normalized_name where status='pending')
+        # Savepoint keeps the tournament transaction usable if the insert hits the unique index
+        cur.execute("SAVEPOINT pending_insert")
         try:
             cur.execute("""
                 INSERT INTO pending_entries 
@@ -741,13 +1180,15 @@ def create_pending_entry(conn, sync_run_id, tournament_id, raw_player_name, norm
                 tournament_id,
                 raw_player_name,
                 normalized_name,
-                Json(payload),
-                Json(candidates)
+                Json(payload, dumps=_JSON_DUMPS),
+                Json(candidates, dumps=_JSON_DUMPS)
             ))
             row = cur.fetchone()
             pending_id = row[0] if row else None
+            cur.execute("RELEASE SAVEPOINT pending_insert")
         except (psycopg2.IntegrityError, psycopg2.errors.UniqueViolation) as e:
             # Unique constraint violation - entry already exists, get and update it
+            cur.execute("ROLLBACK TO SAVEPOINT pending_insert")
             cur.execute("""
                 SELECT id FROM pending_entries
                 WHERE tournament_id = %s 
@@ -767,27 +1208,151 @@ def create_pending_entry(conn, sync_run_id, tournament_id, raw_player_name, norm
                         sync_run_id = %s,
                         created_at = NOW()
                     WHERE id = %s
-                """, (Json(candidates), raw_player_name, Json(payload), sync_run_id, pending_id))
+                """, (Json(candidates, dumps=_JSON_DUMPS), raw_player_name, Json(payload, dumps=_JSON_DUMPS), sync_run_id, pending_id))
             else:
                 pending_id = None
     
-    conn.commit()
-    cur.close()
     return pending_id
 
+# Telegram notifications are sent by one long-lived worker thread with its own event loop,
+# so the import never blocks on Telegram API round trips. Started lazily on first use.
+_TG_QUEUE = queue.Queue()
+_TG_WORKER = None
+_TG_WORKER_LOCK = threading.Lock()
+# Sends per drained queue batch; admin message ids are saved once per batch
+TG_BATCH_SIZE = 20
+TG_SEND_ATTEMPTS = 3
+# (pending_id, message_id) pairs waiting for flush_admin_message_ids (worker thread only)
+_ADMIN_MESSAGE_IDS = []
+
+def _tg_send(loop, bots, bot_token, chat_id, text, reply_markup):
+    """Send one message on the worker loop, waiting out Telegram flood limits (429 retry_after)."""
+    bot = bots.get(bot_token)
+    if bot is None:
+        bot = Bot(token=bot_token)
+        loop.run_until_complete(bot.initialize())
+        bots[bot_token] = bot
+    for attempt in range(TG_SEND_ATTEMPTS):
+        try:
+            return loop.run_until_complete(bot.send_message(
+                chat_id=chat_id,
+                text=text,
+                reply_markup=reply_markup
+            ))
+        except RetryAfter as e:
+            if attempt == TG_SEND_ATTEMPTS - 1:
+                raise
+            delay = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+            print(f"WARNING: Telegram flood limit, retrying in {delay}s")
+            time.sleep(delay)
+
+def _tg_worker():
+    """Send queued (bot_token, chat_id, text, reply_markup, on_sent) messages until a None sentinel."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    # One Bot (and its HTTP client / TLS session) per token, owned by this thread only
+    bots = {}
+    stop = False
+    while not stop:
+        # Block for the next message, then drain whatever else is already queued
+        batch = [_TG_QUEUE.get()]
+        while len(batch) < TG_BATCH_SIZE:
+            try:
+                batch.append(_TG_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        for item in batch:
+            if item is None:
+                stop = True
+                continue
+            bot_token, chat_id, text, reply_markup, on_sent = item
+            try:
+                result = _tg_send(loop, bots, bot_token, chat_id, text, reply_markup)
+                if on_sent and result:
+                    on_sent(result.message_id)
+            except Exception as e:
+                print(f"ERROR sending Telegram notification: {e}")
+        flush_admin_message_ids()
+    for bot in bots.values():
+        try:
+            loop.run_until_complete(bot.shutdown())
+        except Exception as e:
+            print(f"WARNING: Failed to shut down Telegram bot: {e}")
+    loop.close()
+
+def enqueue_notification(bot_token, chat_id, text, reply_markup=None, on_sent=None):
+    """
+    Queue a Telegram message for the notification worker and return immediately.
+    on_sent(message_id) is called from the worker thread after a successful send.
+    """
+    global _TG_WORKER
+    if not bot_token or not chat_id:
+        return False
+    with _TG_WORKER_LOCK:
+        if _TG_WORKER is None:
+            _TG_WORKER = threading.Thread(target=_tg_worker, name="tg-notifier", daemon=True)
+            _TG_WORKER.start()
+    _TG_QUEUE.put((bot_token, chat_id, text, reply_markup, on_sent))
+    return True
+
+def stop_notifier(timeout=None):
+    """
+    Wait for queued notifications to be sent, then stop the worker.
+    By default waits until the queue is drained (sends are bounded by TG_SEND_ATTEMPTS).
+    Returns False if the worker is still running after timeout: it may still use the DB pool.
+    """
+    global _TG_WORKER
+    with _TG_WORKER_LOCK:
+        worker, _TG_WORKER = _TG_WORKER, None
+    if worker is None:
+        return True
+    _TG_QUEUE.put(None)
+    worker.join(timeout=timeout)
+    if worker.is_alive():
+        # Queue still holds the None sentinel; the worker is a daemon thread, so these are lost on exit
+        unsent = max(0, _TG_QUEUE.qsize() - 1)
+        print(f"WARNING: Telegram notifier did not finish within {timeout}s: "
+              f"{unsent} notifications unsent, {len(_ADMIN_MESSAGE_IDS)} admin message ids unsaved")
+        return False
+    return True
+
+def save_admin_message_id(pending_id, message_id):
+    """Queue the admin notification message_id of a pending entry; saved by flush_admin_message_ids."""
+    _ADMIN_MESSAGE_IDS.append((pending_id, message_id))
+
+def flush_admin_message_ids():
+    """Store queued admin message_ids with one UPDATE (own connection and transaction)."""
+    if not _ADMIN_MESSAGE_IDS:
+        return
+    pairs = _ADMIN_MESSAGE_IDS[:]
+    del _ADMIN_MESSAGE_IDS[:]
+    conn = None
+    try:
+        conn = get_db_conn()
+        cur = conn.cursor()
+        execute_values(cur, """
+            UPDATE pending_entries AS p
+            SET admin_message_id = v.message_id
+            FROM (VALUES %s) AS v(id, message_id)
+            WHERE p.id = v.id
+        """, pairs)
+        conn.commit()
+        cur.close()
+    except Exception as e:
+        print(f"WARNING: Failed to save admin_message_id for pending_ids={[p[0] for p in pairs]}: {e}")
+        safe_rollback(conn)
+    finally:
+        release_conn(conn)
+
 def send_pending_notification_to_admin(bot_token, admin_chat_id, pending_id, tournament_title, starts_at, raw_player_name, candidates):
     """
-    Send Telegram notification to admin about pending entry.
-    Returns message_id or None.
+    Queue Telegram notification to admin about pending entry.
+    admin_message_id is stored once the message is sent. Returns True if queued.
     """
     if not bot_token or not admin_chat_id:
-        return None
+        return False
     
     try:
-        from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
-        
-        bot = Bot(token=bot_token)
-        
         # Format starts_at
         if starts_at:
             if isinstance(starts_at, datetime):
@@ -836,82 +1401,83 @@ def send_pending_notification_to_admin(bot_token, admin_chat_id, pending_id, tou
         
         keyboard = InlineKeyboardMarkup(buttons)
         
-        # Send message using async
-        try:
-            import asyncio
-            # Create new event loop if needed
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            if loop.is_running():
-                # If loop is already running, we can't use asyncio.run
-                # Use a thread instead
-                import threading
-                result_container = {'result': None, 'error': None}
-                
-                def send_in_thread():
-                    try:
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        result = new_loop.run_until_complete(bot.send_message(
-                            chat_id=admin_chat_id,
-                            text=message,
-                            reply_markup=keyboard
-                        ))
-                        result_container['result'] = result
-                        new_loop.close()
-                    except Exception as e:
-                        result_container['error'] = e
-                
-                thread = threading.Thread(target=send_in_thread)
-                thread.start()
-                thread.join(timeout=10)
-                
-                if result_container['error']:
-                    raise result_container['error']
-                result = result_container['result']
-            else:
-                result = loop.run_until_complete(bot.send_message(
-                    chat_id=admin_chat_id,
-                    text=message,
-                    reply_markup=keyboard
-                ))
-            
-            return result.message_id if result else None
-        except Exception as e:
-            print(f"ERROR sending pending notification: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+        return enqueue_notification(
+            bot_token, admin_chat_id, message, keyboard,
+            on_sent=partial(save_admin_message_id, pending_id)
+        )
     except Exception as e:
         print(f"ERROR sending pending notification: {e}")
-        return None
+        return False
+
+def fetch_current_entries(conn, tournament_keys):
+    """
+    Fetch current entries of many existing tournaments in one query.
+    tournament_keys: list of (location, starts_at) as used by upsert_tournament.
+    Returns dict tournament_id -> list of (entry_id, player_id, payment_status, manual_paid, full_name);
+    every matched tournament has a key, even without entries.
+    """
+    if not tournament_keys:
+        return {}
+    
+    cur = shared_cursor(conn)
+    cur.execute("""
+        SELECT t.id, e.id, e.player_id, e.payment_status, e.manual_paid, p.full_name
+        FROM tournaments t
+        JOIN unnest(%s::text[], %s::timestamptz[]) AS k(location, starts_at)
+          ON t.location = k.location AND t.starts_at = k.starts_at
+        LEFT JOIN (entries e JOIN players p ON e.player_id = p.id)
+          ON e.tournament_id = t.id
+    """, ([k[0] for k in tournament_keys], [k[1] for k in tournament_keys]))
+    
+    entries_by_tournament = {}
+    for tournament_id, *entry_row in cur.fetchall():
+        rows = entries_by_tournament.setdefault(tournament_id, [])
+        if entry_row[0] is not None:
+            rows.append(tuple(entry_row))
+    return entries_by_tournament
 
-def process_tournament(conn, tournament_data, stats, global_last_updated=None, processed_tournament_ids=None, sync_run_id=None):
-    """Process single tournament: upsert tournament, participants, and handle removed entries."""
+def process_tournament(conn, tournament_data, stats, global_last_updated=None, processed_tournament_ids=None, sync_run_id=None, prefetched_entries=None, notifications=None, upserted=None):
+    """
+    Process single tournament: upsert tournament, participants, and handle removed entries.
+    All work runs in one transaction; the caller commits (or rolls back on error).
+    prefetched_entries: optional dict from fetch_current_entries; consumed per tournament.
+    notifications: list collecting deferred after-commit actions (zero-arg callables): Telegram
+    sends and in-memory player registration. The caller runs them after commit, so admins are
+    never notified about (and the maps never hold) rolled-back rows.
+    upserted: (tournament_id, was_new) if the tournament was already upserted by bulk_upsert_tournaments.
+    """
+    if notifications is None:
+        notifications = []
+    
     # 1. UPSERT tournament
     tournament_info = tournament_data.get('tournament', {})
-    tournament_id, was_new = upsert_tournament(conn, tournament_data, global_last_updated)
+    if upserted is None:
+        upserted = upsert_tournament(conn, tournament_data, global_last_updated)
+    tournament_id, was_new = upserted
     stats['tournaments_upsert'] += 1
     if processed_tournament_ids is not None:
         processed_tournament_ids.add(tournament_id)
     
     # 2. Get participants list
     participants = tournament_data.get('participants', [])
-    participant_names = [p for p in participants if p]  # Filter empty strings
+    # Filter empty strings and repeats (order preserved): each name is resolved once
+    participant_names = list(dict.fromkeys(p for p in participants if p))
     
     # 3. Get current player_ids for this tournament
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT e.id, e.player_id, e.payment_status, e.manual_paid, p.full_name
-        FROM entries e
-        JOIN players p ON e.player_id = p.id
-        WHERE e.tournament_id = %s
-    """, (tournament_id,))
-    current_entries = cur.fetchall()
+    cur = shared_cursor(conn)
+    if was_new:
+        current_entries = []
+    elif prefetched_entries is not None and tournament_id in prefetched_entries:
+        # pop: a tournament repeated in JSON must see entries written by its first pass
+        current_entries = prefetched_entries.pop(tournament_id)
+    else:
+        cur.execute("""
+            SELECT e.id, e.player_id, e.payment_status, e.manual_paid, p.full_name
+            FROM entries e
+            JOIN players p ON e.player_id = p.id
+            WHERE e.tournament_id = %s
+        """, (tournament_id,))
+        current_entries = cur.fetchall()
     
     # 4. Process participants
     processed_player_ids = set()
@@ -924,12 +1490,22 @@ def process_tournament(conn, tournament_data, stats, global_last_updated=None, p
     tournament_title = tour_row[0] if tour_row else "Неизвестный турнир"
     tournament_starts_at = tour_row[1] if tour_row else None
     
+    # Prefetch alias/exact hits and fuzzy pools for all participants at once
+    resolutions = resolve_players_bulk(conn, participant_names)
+    players_created = False
+    entry_player_ids = []
+    
     for participant_name in participant_names:
         if not participant_name:
             continue
         
         # Resolve player using unified logic
-        player_id, resolution_status = resolve_player_id(conn, participant_name, sync_run_id, tournament_id)
+        # Prefetched data is a snapshot: once a player is created in this tournament,
+        # fall back to live lookups so later names can match it
+        prefetched = None if players_created else resolutions.get(participant_name)
+        player_id, resolution_status, pending = resolve_player_id(conn, participant_name, sync_run_id, tournament_id, prefetched)
+        if resolution_status == "new_player_created":
+            players_created = True
         
         if resolution_status == "resolved":
             # Alias or exact match found - create/update entry
@@ -937,131 +1513,231 @@ def process_tournament(conn, tournament_data, stats, global_last_updated=None, p
                 stats['players_upsert'] += 1
                 processed_player_ids.add(player_id)
             
-            entry_id, was_new = upsert_entry(conn, tournament_id, player_id)
-            if was_new:
-                stats['entries_new'] += 1
-            else:
-                stats['entries_existing'] += 1
+            entry_player_ids.append(player_id)
         elif resolution_status == "pending_created":
             # Pending created (has candidates within threshold) - DO NOT create player or entry
-            # Get pending_id from last created pending (or we could return it from resolve_player_id)
-            cur.execute("""
-                SELECT id, candidates FROM pending_entries
-                WHERE tournament_id = %s 
-                  AND normalized_name = %s
-                  AND status = 'pending'
-                ORDER BY created_at DESC
-                LIMIT 1
-            """, (tournament_id, normalize_name(participant_name)))
-            pending_row = cur.fetchone()
+            pending_id, candidates = pending
             
-            if pending_row:
-                pending_id, candidates_json = pending_row
-                # Parse candidates if needed
-                if isinstance(candidates_json, list):
-                    candidates = candidates_json
-                else:
-                    import json
-                    candidates = json.loads(candidates_json) if candidates_json else []
-                
-                print(f"PENDING CREATED: {participant_name} -> {len(candidates)} candidates, pending_id={pending_id}")
-                print(f"  -> NOT creating player/entry, waiting for admin resolution")
-                
-                # Send notification to admin
-                message_id = send_pending_notification_to_admin(
-                    bot_token, admin_chat_id, pending_id,
-                    tournament_title, tournament_starts_at,
-                    participant_name, candidates
-                )
-                
-                # Update admin_message_id
-                if message_id:
-                    cur.execute("""
-                        UPDATE pending_entries 
-                        SET admin_message_id = %s 
-                        WHERE id = %s
-                    """, (message_id, pending_id))
-                    conn.commit()
-            else:
-                print(f"PENDING ERROR: Failed to find pending entry for {participant_name}")
+            print(f"PENDING CREATED: {participant_name} -> {len(candidates)} candidates, pending_id={pending_id}")
+            print(f"  -> NOT creating player/entry, waiting for admin resolution")
+            
+            # Notify admin after commit (admin_message_id is stored once sent)
+            notifications.append(partial(
+                send_pending_notification_to_admin,
+                bot_token, admin_chat_id, pending_id,
+                tournament_title, tournament_starts_at,
+                participant_name, candidates
+            ))
         elif resolution_status == "new_player_created":
             # New player created automatically (no candidates within threshold) - create entry
             if player_id not in processed_player_ids:
                 stats['players_upsert'] += 1
                 processed_player_ids.add(player_id)
             
-            entry_id, was_new = upsert_entry(conn, tournament_id, player_id)
-            if was_new:
-                stats['entries_new'] += 1
-            else:
-                stats['entries_existing'] += 1
+            entry_player_ids.append(player_id)
+            # Make the player visible to later tournaments' in-memory lookups (after commit)
+            notifications.append(partial(register_player, player_id, participant_name))
             
-            # Optional: send info to admin about new player
+            # Optional: send info to admin about new player (after commit)
             if bot_token and admin_chat_id:
-                try:
-                    import asyncio
-                    from telegram import Bot
-                    bot = Bot(token=bot_token)
-                    info_msg = f"ℹ️ Добавлен новый игрок: {participant_name}"
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            import threading
-                            def send_info():
-                                new_loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(new_loop)
-                                new_loop.run_until_complete(bot.send_message(
-                                    chat_id=admin_chat_id,
-                                    text=info_msg
-                                ))
-                                new_loop.close()
-                            thread = threading.Thread(target=send_info)
-                            thread.start()
-                            thread.join(timeout=5)
-                        else:
-                            loop.run_until_complete(bot.send_message(
-                                chat_id=admin_chat_id,
-                                text=info_msg
-                            ))
-                    except Exception as e:
-                        print(f"INFO: Failed to send new player notification: {e}")
-                except Exception as e:
-                    pass  # Ignore errors in optional notification
+                notifications.append(partial(
+                    enqueue_notification,
+                    bot_token, admin_chat_id, f"ℹ️ Добавлен новый игрок: {participant_name}"
+                ))
+    
+    # Create/update entries for all resolved players in one statement
+    for entry_id, was_new in bulk_upsert_entries(conn, tournament_id, entry_player_ids):
+        if was_new:
+            stats['entries_new'] += 1
+        else:
+            stats['entries_existing'] += 1
     
     # 5. Handle entries that are no longer in participants
     # Get player_ids for new participants
     new_player_ids = set()
-    for participant_name in participant_names:
-        cur.execute("SELECT id FROM players WHERE full_name = %s", (participant_name,))
-        row = cur.fetchone()
-        if row:
-            new_player_ids.add(row[0])
+    if participant_names:
+        cur.execute("SELECT id FROM players WHERE full_name = ANY(%s)", (participant_names,))
+        new_player_ids = {row[0] for row in cur.fetchall()}
     
     # Find entries that are not in new participants list
-    for entry_row in current_entries:
-        entry_id, player_id, payment_status, manual_paid, full_name = entry_row
-        if player_id not in new_player_ids:
-            # This entry is no longer in participants
-            if payment_status == 'paid' or manual_paid:
-                # Mark as inactive (preserve paid entries) - only if column exists
-                has_entry_active = check_column_exists(conn, 'entries', 'active')
-                if has_entry_active:
-                    cur.execute("""
-                        UPDATE entries
-                        SET active = false
-                        WHERE id = %s
-                    """, (entry_id,))
-                stats['entries_inactivated'] += 1
+    has_entry_active = check_column_exists(conn, 'entries', 'active')
+    gone_ids = [entry_id for entry_id, player_id, _, _, _ in current_entries if player_id not in new_player_ids]
+    
+    if gone_ids:
+        # Paid status is re-checked in the statements themselves: current_entries is a
+        # snapshot from the start of the run, and a player may have paid since then.
+        # Delete entries that are not paid (safe to delete)
+        cur.execute("""
+            DELETE FROM entries
+            WHERE id = ANY(%s)
+              AND payment_status IS DISTINCT FROM 'paid'
+              AND NOT COALESCE(manual_paid, false)
+            RETURNING id
+        """, (gone_ids,))
+        deleted_ids = {row[0] for row in cur.fetchall()}
+        stats['entries_deleted'] += len(deleted_ids)
+        
+        # Mark the rest as inactive (preserve paid entries)
+        inactivate_ids = [entry_id for entry_id in gone_ids if entry_id not in deleted_ids]
+        if inactivate_ids:
+            # Only if column exists
+            if has_entry_active:
+                cur.execute("""
+                    UPDATE entries
+                    SET active = false
+                    WHERE id = ANY(%s)
+                      AND (payment_status = 'paid' OR manual_paid)
+                """, (inactivate_ids,))
+                stats['entries_inactivated'] += cur.rowcount
             else:
-                # Delete entry (not paid, safe to delete)
-                cur.execute("DELETE FROM entries WHERE id = %s", (entry_id,))
-                stats['entries_deleted'] += 1
+                stats['entries_inactivated'] += len(inactivate_ids)
+
+def process_tournament_task(tournament_data, label, starts_at, global_last_updated=None, sync_run_id=None, prefetched_entries=None):
+    """
+    Process one tournament on its own pooled connection in its own transaction
+    (fallback for process_tournament_batch).
+    Returns (stats Counter, processed tournament ids, error message or None).
+    """
+    print(f"Processing tournament: {label} (starts_at={starts_at.strftime('%Y-%m-%d %H:%M')} MSK)")
     
-    conn.commit()
+    conn = None
+    err_msg = None
+    # Concurrent tournaments may create the same new player; retry once on deadlock
+    for attempt in range(2):
+        stats = Counter()
+        processed_ids = set()
+        notifications = []
+        try:
+            conn = get_db_conn() if conn is None else ensure_conn(conn)
+            process_tournament(conn, tournament_data, stats, global_last_updated, processed_ids, sync_run_id, prefetched_entries, notifications)
+            conn.commit()
+            err_msg = None
+            for send in notifications:
+                send()
+            break
+        except psycopg2.errors.DeadlockDetected as e:
+            err_msg = str(e)
+            print(f"TOURNAMENT DEADLOCK: {label}, attempt={attempt + 1}, err={err_msg}")
+            safe_rollback(conn)
+        except Exception as e:
+            err_msg = str(e)
+            safe_rollback(conn)
+            break
+    
+    release_conn(conn)
+    return stats, processed_ids, err_msg
+
+def env_int(name, default):
+    """Integer env setting; falls back to default if unset or malformed."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"WARNING: Invalid {name}={value!r}, using {default}")
+        return default
+
+# Group commit: a worker commits every COMMIT_BATCH tournaments or COMMIT_INTERVAL_S seconds.
+# Parsed defensively: main.py imports this module inside request handlers
+COMMIT_BATCH = max(1, env_int("IMPORT_COMMIT_BATCH", 25))
+COMMIT_INTERVAL_S = 2.0
+# Batch transactions skip the WAL flush wait (SET LOCAL synchronous_commit = off). A crash can
+# lose the last ~second of commits but never corrupts data, and the next run re-imports them.
+ASYNC_COMMIT = os.getenv("IMPORT_ASYNC_COMMIT", "1") == "1"
+# Transaction-level tuning for batch transactions, sent in one round trip. SET LOCAL rather
+# than session SET / connect options, so nothing leaks to other clients of the pooler.
+# jit: compile cost outweighs any gain on short upserts; work_mem: fuzzy pool sorts in memory.
+BATCH_SETTINGS_SQL = "; ".join(
+    ["SET LOCAL jit = off", "SET LOCAL work_mem = '64MB'"]
+    + (["SET LOCAL synchronous_commit = off"] if ASYNC_COMMIT else [])
+)
+
+def process_tournament_batch(batch, global_last_updated=None, sync_run_id=None, prefetched_entries=None):
+    """
+    Worker for the tournament thread pool: process a batch of (tournament_data, title, location, starts_at)
+    on one pooled connection with group commits. Each tournament runs under its own SAVEPOINT,
+    so a failing tournament is rolled back alone. If the connection itself fails, uncommitted
+    and remaining tournaments are redone one by one via process_tournament_task.
+    Returns (stats Counter, processed tournament ids, [(title, starts_at, error message)]).
+    """
+    stats = Counter()
+    processed_ids = set()
+    errors = []
+    uncommitted = []  # (item, stats, processed ids, notifications) since last commit
+    next_index = 0
+    conn = None
+    
+    try:
+        conn = get_db_conn()
+        cur = conn.cursor()
+        cur.execute(BATCH_SETTINGS_SQL)
+        last_commit = time.monotonic()
+        # Upsert all tournaments of the batch in one statement
+        batch_upserted = bulk_upsert_tournaments(conn, [item[0] for item in batch], global_last_updated)
+        for i, item in enumerate(batch):
+            next_index = i
+            tournament_data, title, location, starts_at = item
+            print(f"Processing tournament: {title} at {location} (starts_at={starts_at.strftime('%Y-%m-%d %H:%M')} MSK)")
+            
+            # Concurrent tournaments may create the same new player; retry once on deadlock
+            for attempt in range(2):
+                t_stats, t_ids, notifications = Counter(), set(), []
+                cur.execute("SAVEPOINT tournament")
+                try:
+                    process_tournament(conn, tournament_data, t_stats, global_last_updated, t_ids, sync_run_id, prefetched_entries, notifications, batch_upserted[i])
+                    cur.execute("RELEASE SAVEPOINT tournament")
+                    uncommitted.append((item, t_stats, t_ids, notifications))
+                    break
+                except psycopg2.errors.DeadlockDetected as e:
+                    print(f"TOURNAMENT DEADLOCK: {title} at {location}, attempt={attempt + 1}, err={e}")
+                    cur.execute("ROLLBACK TO SAVEPOINT tournament")
+                    if attempt == 1:
+                        errors.append((title, starts_at, str(e)))
+                except Exception as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT tournament")
+                    errors.append((title, starts_at, str(e)))
+                    break
+            next_index = i + 1
+            
+            if (len(uncommitted) >= COMMIT_BATCH
+                    or time.monotonic() - last_commit > COMMIT_INTERVAL_S
+                    or next_index == len(batch)):
+                conn.commit()
+                last_commit = time.monotonic()
+                if next_index < len(batch):
+                    # SET LOCAL ends with the transaction; reapply for the next one
+                    cur.execute(BATCH_SETTINGS_SQL)
+                for _, t_stats, t_ids, notifications in uncommitted:
+                    stats.update(t_stats)
+                    processed_ids.update(t_ids)
+                    for send in notifications:
+                        send()
+                uncommitted = []
+        cur.close()
+    except Exception as e:
+        # Connection-level failure: fall back to per-tournament transactions
+        redo = [u[0] for u in uncommitted] + list(batch[next_index:])
+        print(f"BATCH ERROR: {e}; retrying {len(redo)} tournaments one by one")
+        safe_rollback(conn)
+        release_conn(conn, close=True)
+        conn = None
+        for tournament_data, title, location, starts_at in redo:
+            t_stats, t_ids, err_msg = process_tournament_task(
+                tournament_data, f"{title} at {location}", starts_at,
+                global_last_updated, sync_run_id, prefetched_entries
+            )
+            stats.update(t_stats)
+            processed_ids.update(t_ids)
+            if err_msg:
+                errors.append((title, starts_at, err_msg))
+    
+    release_conn(conn)
+    return stats, processed_ids, errors
 
 def create_sync_run(conn, json_path):
-    """Create sync_runs record and return sync_run_id."""
-    cur = conn.cursor()
+    """Create sync_runs record and return (sync_run_id, started_at). Does not commit - caller owns the transaction."""
+    cur = shared_cursor(conn)
     
     # Get JSON file mtime
     json_mtime = None
@@ -1071,16 +1747,15 @@ def create_sync_run(conn, json_path):
     cur.execute("""
         INSERT INTO sync_runs (source, started_at, json_path, json_mtime)
         VALUES ('lunda', NOW(), %s, %s)
-        RETURNING id
+        RETURNING id, started_at
     """, (json_path, json_mtime))
     
-    sync_run_id = cur.fetchone()[0]
-    conn.commit()
-    return sync_run_id
+    sync_run_id, started_at = cur.fetchone()
+    return sync_run_id, started_at
 
 def update_sync_run(conn, sync_run_id, stats, error=None):
-    """Update sync_runs record with statistics."""
-    cur = conn.cursor()
+    """Update sync_runs record with statistics and commit (together with any pending work on conn)."""
+    cur = shared_cursor(conn)
     
     cur.execute("""
         UPDATE sync_runs
@@ -1106,129 +1781,121 @@ def update_sync_run(conn, sync_run_id, stats, error=None):
     
     conn.commit()
 
-def archive_past_tournaments(conn, cutoff_time, stats):
-    """Archive tournaments that are past (starts_at < cutoff_time). One-time operation."""
-    # Ensure connection is alive
-    conn = ensure_conn(conn)
-    cur = conn.cursor()
-    
-    try:
-        # Check if archived_at column exists
-        has_archived_at = check_column_exists(conn, 'tournaments', 'archived_at')
-        
-        if not has_archived_at:
-            print("WARNING: archived_at column not found. Skipping past tournaments archiving.")
-            return
-        
-        # Find past tournaments that are not yet archived
-        # Convert cutoff_time to UTC for database comparison (PostgreSQL stores timestamptz in UTC)
-        cutoff_utc = cutoff_time.astimezone(timezone.utc)
-        
-        query = """
-            SELECT id, title, location, starts_at
-            FROM tournaments
-            WHERE archived_at IS NULL
-              AND starts_at < %s
-            ORDER BY starts_at DESC
-        """
-        
-        cur.execute(query, (cutoff_utc,))
-        past_tournaments = cur.fetchall()
-        
-        archived_count = 0
-        for tournament_id, title, location, starts_at in past_tournaments:
-            cur.execute("""
-                UPDATE tournaments
-                SET archived_at = NOW()
-                WHERE id = %s AND archived_at IS NULL
-            """, (tournament_id,))
-            
-            if cur.rowcount > 0:
-                archived_count += 1
-                stats['tournaments_archived'] += 1
-        
-        conn.commit()
-        
-        if archived_count > 0:
-            print(f"Archived {archived_count} past tournaments (starts_at < {cutoff_time.strftime('%Y-%m-%d %H:%M')} MSK)")
-        else:
-            print("No past tournaments to archive")
-    finally:
-        cur.close()
+def explain_query(conn, query, params):
+    """Print the query plan (EXPLAIN, not executed) when IMPORT_EXPLAIN=1."""
+    if os.getenv("IMPORT_EXPLAIN") != "1":
+        return
+    cur = shared_cursor(conn)
+    cur.execute("EXPLAIN " + query, params)
+    print("EXPLAIN:\n" + "\n".join(row[0] for row in cur.fetchall()))
 
-def process_missing_tournaments(conn, processed_tournament_ids, run_started_at, stats):
-    """Archive tournaments that are not in current JSON (JSON is source of truth). Returns list of archived tournament IDs."""
+def archive_tournaments(conn, cutoff_time, processed_tournament_ids, run_started_at, stats):
+    """
+    Archive past tournaments (starts_at < cutoff_time) and, if run_started_at is given,
+    tournaments missing from the current JSON (JSON is source of truth) in one UPDATE.
+    Returns list of archived missing tournament IDs.
+    """
     # Ensure connection is alive
     conn = ensure_conn(conn)
-    cur = conn.cursor()
+    cur = shared_cursor(conn)
     
-    try:
-        # Check if required columns exist
-        has_last_seen = check_column_exists(conn, 'tournaments', 'last_seen_in_source')
-        has_archived_at = check_column_exists(conn, 'tournaments', 'archived_at')
-        
-        # If columns don't exist, skip this functionality
-        if not has_last_seen or not has_archived_at:
-            print("WARNING: Required columns (last_seen_in_source, archived_at) not found.")
-            print("Please run migration 004_fix_tournament_archiving.sql first.")
-            return []
-        
-        # Find tournaments that were NOT seen in this run
-        # Archive tournaments where:
-        # - archived_at IS NULL (not already archived)
-        # - last_seen_in_source IS NULL OR last_seen_in_source < run_started_at (not seen in this run)
-        # - id NOT IN processed_tournament_ids (not in current JSON)
-        if processed_tournament_ids:
-            # Use NOT IN for list of IDs
-            placeholders = ','.join(['%s'] * len(processed_tournament_ids))
-            query = f"""
-                SELECT t.id, t.title, t.location, t.starts_at
-                FROM tournaments t
-                WHERE t.archived_at IS NULL
-                  AND (t.last_seen_in_source IS NULL OR t.last_seen_in_source < %s)
-                  AND t.id NOT IN ({placeholders})
-            """
-            params = [run_started_at] + list(processed_tournament_ids)
+    # Check if required columns exist
+    columns = check_columns_exist(conn, 'tournaments', ('last_seen_in_source', 'archived_at'))
+    
+    if 'archived_at' not in columns:
+        print("WARNING: archived_at column not found. Skipping tournaments archiving.")
+        return []
+    
+    check_missing = run_started_at is not None
+    if check_missing and 'last_seen_in_source' not in columns:
+        print("WARNING: Required columns (last_seen_in_source, archived_at) not found.")
+        print("Please run migration 004_fix_tournament_archiving.sql first.")
+        check_missing = False
+    
+    # Convert cutoff_time to UTC for database comparison (PostgreSQL stores timestamptz in UTC)
+    cutoff_utc = cutoff_time.astimezone(timezone.utc)
+    
+    # Past: starts_at < cutoff. Missing: not seen in this run and not in current JSON
+    # (an empty id array excludes nothing). Archive, don't delete - preserve history.
+    missing_condition = """
+           OR ((last_seen_in_source IS NULL OR last_seen_in_source < %(run_started_at)s)
+               AND NOT (id = ANY(%(processed_ids)s::bigint[])))""" if check_missing else ""
+    query = f"""
+        UPDATE tournaments
+        SET archived_at = NOW()
+        WHERE archived_at IS NULL
+          AND (starts_at < %(cutoff)s{missing_condition})
+        RETURNING id, title, location, starts_at < %(cutoff)s AS is_past
+    """
+    params = {
+        'cutoff': cutoff_utc,
+        'run_started_at': run_started_at,
+        'processed_ids': list(processed_tournament_ids),
+    }
+    explain_query(conn, query, params)
+    cur.execute(query, params)
+    
+    past_count = 0
+    archived_ids = []
+    for tournament_id, title, location, is_past in cur.fetchall():
+        stats['tournaments_archived'] += 1
+        if is_past:
+            past_count += 1
         else:
-            # If no processed tournaments, archive all that weren't seen
-            query = """
-                SELECT t.id, t.title, t.location, t.starts_at
-                FROM tournaments t
-                WHERE t.archived_at IS NULL
-                  AND (t.last_seen_in_source IS NULL OR t.last_seen_in_source < %s)
-            """
-            params = [run_started_at]
-        
-        cur.execute(query, params)
-        missing_tournaments = cur.fetchall()
-        
-        archived_ids = []
-        for tournament_id, title, location, starts_at in missing_tournaments:
-            # Archive tournament (don't delete - preserve history)
-            cur.execute("""
-                UPDATE tournaments
-                SET archived_at = NOW()
-                WHERE id = %s AND archived_at IS NULL
-            """, (tournament_id,))
-            
-            # Check if tournament was actually updated
-            if cur.rowcount > 0:
-                stats['tournaments_archived'] += 1
-                archived_ids.append(tournament_id)
-                print(f"ARCHIVED tournament: id={tournament_id}, title={title}, location={location}")
-        
-        conn.commit()
-        
-        # Log summary
+            archived_ids.append(tournament_id)
+            print(f"ARCHIVED tournament: id={tournament_id}, title={title}, location={location}")
+    
+    conn.commit()
+    
+    if past_count > 0:
+        print(f"Archived {past_count} past tournaments (starts_at < {cutoff_time.strftime('%Y-%m-%d %H:%M')} MSK)")
+    else:
+        print("No past tournaments to archive")
+    
+    # Log summary
+    if check_missing:
         if archived_ids:
             print(f"\nARCHIVING SUMMARY: {len(archived_ids)} tournaments archived")
             print(f"Example archived IDs: {archived_ids[:3]}")
         else:
             print("\nARCHIVING SUMMARY: No tournaments archived (all present in JSON)")
+    
+    return archived_ids
+
+def select_future_tournaments(tournaments_iter, cutoff_time, stats, verbose=False):
+    """
+    Consume parsed tournaments and keep those starting at/after cutoff_time.
+    Returns (future_tournaments as (tournament_data, title, location, starts_at), tournaments_total).
+    Past tournaments are dropped as they are streamed, but every future tournament is kept
+    in the returned list: the entries prefetch and batch sizing need the whole future slice,
+    so peak memory is bounded by that slice, not by a single tournament.
+    """
+    future_tournaments = []
+    tournaments_total = 0
+    for tournament_data in tournaments_iter:
+        tournaments_total += 1
+        tournament_info = tournament_data.get('tournament', {})
+        title = tournament_info.get('title', 'Unknown')
+        location = tournament_info.get('location', 'Unknown')
         
-        return archived_ids
-    finally:
-        cur.close()
+        # Get and normalize starts_at
+        starts_at_raw = tournament_data.get('start_datetime')
+        starts_at = normalize_msk(starts_at_raw)
+        
+        # Skip past tournaments (before cutoff)
+        if starts_at is None:
+            print(f"SKIPPED tournament (no starts_at): {title} at {location}")
+            stats['tournaments_skipped_past'] += 1
+            continue
+        
+        if starts_at < cutoff_time:
+            if verbose:
+                print(f"SKIPPED past tournament: {title} at {location} (starts_at={starts_at.strftime('%Y-%m-%d %H:%M')} MSK)")
+            stats['tournaments_skipped_past'] += 1
+            continue
+        
+        future_tournaments.append((tournament_data, title, location, starts_at))
+    return future_tournaments, tournaments_total
 
 def main():
     """Main import function."""
@@ -1258,86 +1925,136 @@ def main():
         print("ERROR: LUNDA_JSON_PATH not set")
         return 0  # Exit 0 for launchd
     
-    # Load JSON
+    # Calculate cutoff time: now_msk - grace (grace = 6 hours)
+    # Same tzinfo as normalize_msk results, so the per-tournament comparison needs no tz arithmetic
+    now_msk = now_local
+    grace_hours = 6
+    cutoff_time = now_msk - timedelta(hours=grace_hours)
+    print(f"Cutoff time (MSK): {cutoff_time.strftime('%Y-%m-%d %H:%M:%S %z')}")
+    print(f"Tournaments with starts_at < {cutoff_time.strftime('%Y-%m-%d %H:%M')} MSK will be skipped")
+    
+    # Statistics
+    stats = {
+        'tournaments_upsert': 0,
+        'players_upsert': 0,
+        'entries_new': 0,
+        'entries_existing': 0,
+        'entries_deleted': 0,
+        'entries_inactivated': 0,
+        'tournaments_archived': 0,
+        'tournaments_skipped_past': 0,
+        'tournaments_deleted': 0
+    }
+    
+    # Load JSON (streamed: past tournaments are dropped as soon as they are parsed;
+    # the future slice is collected in full by select_future_tournaments)
     print(f"Loading JSON from: {json_path}")
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        global_last_updated, tournaments_type, tournaments_iter = open_lunda_json(json_path)
     except FileNotFoundError:
         print(f"ERROR: File not found: {json_path}")
         return 0  # Exit 0 for launchd
-    except json.JSONDecodeError as e:
+    except JSON_ERRORS as e:
         print(f"ERROR: Invalid JSON: {e}")
         return 0  # Exit 0 for launchd
     
-    # Get tournaments dict/list
-    tournaments_raw = data.get('tournaments', {})
-    if not tournaments_raw:
+    if tournaments_type is None:
         print("ERROR: No 'tournaments' key in JSON")
         return 0  # Exit 0 for launchd
     
     # Debug output
-    print(f"DEBUG: data['tournaments'] type: {type(tournaments_raw).__name__}")
+    print(f"DEBUG: data['tournaments'] type: {tournaments_type}")
     
-    # Extract tournaments list from dict or use as-is if list
-    if isinstance(tournaments_raw, dict):
-        tournaments_list = list(tournaments_raw.values())
-    elif isinstance(tournaments_raw, list):
-        tournaments_list = tournaments_raw
-    else:
-        print(f"ERROR: Unexpected type for tournaments: {type(tournaments_raw)}")
+    if tournaments_type not in ('dict', 'list'):
+        print(f"ERROR: Unexpected type for tournaments: {tournaments_type}")
         return 0  # Exit 0 for launchd
     
-    print(f"Found {len(tournaments_list)} tournaments in JSON")
+    # Per-tournament skip lines are only printed with IMPORT_VERBOSE=1 (the total is in statistics)
+    verbose = os.getenv("IMPORT_VERBOSE") == "1"
     
-    # Get global last_updated if available
-    global_last_updated = data.get('last_updated')
+    # Tournaments are processed in parallel, one pooled connection per worker
+    workers = max(1, env_int("IMPORT_WORKERS", 4))
     
-    # Connect to DB
+    # Parse/filter the JSON in a background thread while connecting to the DB
+    # (pool start-up opens several SSL connections; psycopg2 releases the GIL meanwhile).
+    # This overlaps parsing with connecting only: processing starts after the whole
+    # future slice is collected, it is not fed tournament by tournament
     conn = None
+    db_error = None
+    with ThreadPoolExecutor(max_workers=1) as parse_executor:
+        parse_future = parse_executor.submit(select_future_tournaments, tournaments_iter, cutoff_time, stats, verbose)
+        try:
+            get_pool(minconn=workers + 1, maxconn=workers + 2)
+            conn = get_db_conn()
+        except Exception as e:
+            db_error = e
+        try:
+            future_tournaments, tournaments_total = parse_future.result()
+        except JSON_ERRORS as e:
+            print(f"ERROR: Invalid JSON: {e}")
+            release_conn(conn)
+            close_pool()
+            return 0  # Exit 0 for launchd
+    
+    if tournaments_total == 0:
+        # Empty JSON must not archive every tournament as "missing"
+        print("ERROR: No 'tournaments' key in JSON")
+        release_conn(conn)
+        close_pool()
+        return 0  # Exit 0 for launchd
+    
+    print(f"Found {tournaments_total} tournaments in JSON")
+    
+    if db_error is not None:
+        print(f"ERROR: Failed to connect to database: {db_error}")
+        close_pool()
+        return 0  # Exit 0 for launchd
+    
+    # Load the import tables' columns once; workers then never hit information_schema
     try:
-        conn = get_db_conn()
+        preload_schema(conn)
     except Exception as e:
-        print(f"ERROR: Failed to connect to database: {e}")
-        return 0  # Exit 0 for launchd
+        print(f"WARNING: Failed to preload schema: {e}")
+        safe_rollback(conn)
+    
+    # Load aliases / player names once; per-tournament resolution then only queries new names
+    try:
+        conn = ensure_conn(conn)
+        alias_count, name_count = preload_player_maps(conn)
+        print(f"Preloaded {alias_count} aliases and {name_count} player names")
+    except Exception as e:
+        print(f"WARNING: Failed to preload player maps: {e}")
+        safe_rollback(conn)
+    
+    # Prefetch current entries of all future tournaments (falls back to per-tournament queries on error)
+    prefetched_entries = None
+    try:
+        conn = ensure_conn(conn)
+        prefetched_entries = fetch_current_entries(conn, [
+            (t[0].get('tournament', {}).get('location', '') or '', t[3])
+            for t in future_tournaments
+        ])
+    except Exception as e:
+        print(f"WARNING: Failed to prefetch current entries: {e}")
+        safe_rollback(conn)
     
-    # Create sync run record
+    # Create sync run record (same transaction as the prefetch read: one commit for both).
+    # It must be committed before the workers start: they write pending_entries
+    # referencing sync_run_id from their own connections.
     sync_run_id = None
     run_started_at = None
     try:
-        sync_run_id = create_sync_run(conn, json_path)
+        # run_started_at is used for processing missing tournaments
+        sync_run_id, run_started_at = create_sync_run(conn, json_path)
+        conn.commit()
         print(f"Created sync run: id={sync_run_id}")
-        
-        # Get run_started_at for processing missing tournaments
-        cur = conn.cursor()
-        cur.execute("SELECT started_at FROM sync_runs WHERE id = %s", (sync_run_id,))
-        run_started_at = cur.fetchone()[0]
-        cur.close()
     except Exception as e:
         print(f"WARNING: Failed to create sync run: {e}")
+        safe_rollback(conn)
+        sync_run_id = None
         # Continue anyway
         run_started_at = datetime.now()
     
-    # Calculate cutoff time: now_msk - grace (grace = 6 hours)
-    now_msk = datetime.now(MSK_TZ)
-    grace_hours = 6
-    cutoff_time = now_msk - timedelta(hours=grace_hours)
-    print(f"Cutoff time (MSK): {cutoff_time.strftime('%Y-%m-%d %H:%M:%S %z')}")
-    print(f"Tournaments with starts_at < {cutoff_time.strftime('%Y-%m-%d %H:%M')} MSK will be skipped")
-    
-    # Statistics
-    stats = {
-        'tournaments_upsert': 0,
-        'players_upsert': 0,
-        'entries_new': 0,
-        'entries_existing': 0,
-        'entries_deleted': 0,
-        'entries_inactivated': 0,
-        'tournaments_archived': 0,
-        'tournaments_skipped_past': 0,
-        'tournaments_deleted': 0
-    }
-    
     # Track processed tournament IDs
     processed_tournament_ids = set()
     archived_tournament_ids = []
@@ -1347,65 +2064,43 @@ def main():
     error_occurred = None
     tournament_errors = []
     
-    for tournament_data in tournaments_list:
-        tournament_info = tournament_data.get('tournament', {})
-        title = tournament_info.get('title', 'Unknown')
-        location = tournament_info.get('location', 'Unknown')
-        
-        # Get and normalize starts_at
-        starts_at_raw = tournament_data.get('start_datetime')
-        starts_at = normalize_msk(starts_at_raw)
-        
-        # Skip past tournaments (before cutoff)
-        if starts_at is None:
-            print(f"SKIPPED tournament (no starts_at): {title} at {location}")
-            stats['tournaments_skipped_past'] += 1
-            continue
-        
-        if starts_at < cutoff_time:
-            print(f"SKIPPED past tournament: {title} at {location} (starts_at={starts_at.strftime('%Y-%m-%d %H:%M')} MSK)")
-            stats['tournaments_skipped_past'] += 1
-            continue
-        
-        # Process only future tournaments - each in separate transaction
-        print(f"Processing tournament: {title} at {location} (starts_at={starts_at.strftime('%Y-%m-%d %H:%M')} MSK)")
-        
-        # Ensure connection is alive before processing
-        try:
-            conn = ensure_conn(conn)
-            process_tournament(conn, tournament_data, stats, global_last_updated, processed_tournament_ids, sync_run_id)
-            conn.commit()
-        except Exception as e:
-            # Tournament error - log and continue
-            err_msg = str(e)
-            tournament_errors.append(f"{title} ({starts_at.strftime('%Y-%m-%d %H:%M') if starts_at else 'no date'}): {err_msg}")
-            print(f"TOURNAMENT ERROR: title={title}, starts_at={starts_at.strftime('%Y-%m-%d %H:%M') if starts_at else 'None'}, err={err_msg}")
-            safe_rollback(conn)
-            # Continue with next tournament
-            continue
-    
-    # Archive past tournaments (one-time, based on cutoff)
+    # Process only future tournaments - in parallel batches, each tournament under its own savepoint,
+    # committed in groups (batch size capped so every worker gets a batch)
+    batch_size = max(1, min(COMMIT_BATCH, -(-len(future_tournaments) // workers)))
+    batches = [future_tournaments[i:i + batch_size] for i in range(0, len(future_tournaments), batch_size)]
+    print(f"Processing {len(future_tournaments)} tournaments with {workers} workers ({len(batches)} batches)")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process_tournament_batch, batch, global_last_updated, sync_run_id, prefetched_entries)
+            for batch in batches
+        ]
+        for future in as_completed(futures):
+            task_stats, task_ids, task_errors = future.result()
+            for key, value in task_stats.items():
+                stats[key] += value
+            processed_tournament_ids.update(task_ids)
+            for title, starts_at, err_msg in task_errors:
+                # Tournament error - log and continue
+                tournament_errors.append(f"{title} ({starts_at.strftime('%Y-%m-%d %H:%M')}): {err_msg}")
+                print(f"TOURNAMENT ERROR: title={title}, starts_at={starts_at.strftime('%Y-%m-%d %H:%M')}, err={err_msg}")
+    
+    # Archive past tournaments and tournaments missing from JSON (one statement)
+    archived_tournament_ids = []
+    missing_since = run_started_at
+    if not processed_tournament_ids and stats['tournaments_upsert'] == 0:
+        # Nothing was imported (all failed or filtered out): don't mass-archive every active tournament
+        print("\nSkipping missing-tournaments check (no tournaments processed)")
+        missing_since = None
     try:
-        print("\nArchiving past tournaments (starts_at < cutoff)...")
+        print("\nArchiving past tournaments (starts_at < cutoff) and tournaments missing from JSON...")
         conn = ensure_conn(conn)
-        archive_past_tournaments(conn, cutoff_time, stats)
+        archived_tournament_ids = archive_tournaments(conn, cutoff_time, processed_tournament_ids, missing_since, stats)
     except Exception as e:
-        print(f"ERROR archiving past tournaments: {e}")
+        print(f"ERROR archiving tournaments: {e}")
+        safe_rollback(conn)
         if not error_occurred:
             error_occurred = f"Archive error: {str(e)}"
     
-    # Process tournaments that are missing from JSON
-    archived_tournament_ids = []
-    if run_started_at:
-        try:
-            print("\nProcessing missing tournaments (not in JSON)...")
-            conn = ensure_conn(conn)
-            archived_tournament_ids = process_missing_tournaments(conn, processed_tournament_ids, run_started_at, stats)
-        except Exception as e:
-            print(f"ERROR processing missing tournaments: {e}")
-            if not error_occurred:
-                error_occurred = f"Missing tournaments error: {str(e)}"
-    
     # Collect tournament errors into main error_occurred
     if tournament_errors:
         if error_occurred:
@@ -1416,39 +2111,49 @@ def main():
         if len(tournament_errors) <= 5:
             for err in tournament_errors:
                 print(f"  - {err}")
-    # Update sync run with statistics
-    # Expire old pending entries
+    # Expire old pending entries and update sync run with statistics - one transaction, one commit
     if sync_run_id:
         try:
             conn = ensure_conn(conn)
             cur = conn.cursor()
-            cur.execute("""
-                UPDATE pending_entries 
-                SET status = 'expired'
-                WHERE status = 'pending' AND sync_run_id <> %s
-            """, (sync_run_id,))
-            expired_count = cur.rowcount
-            conn.commit()
+            # Savepoint: a failed expiration must not prevent the sync run update
+            cur.execute("SAVEPOINT expire_pending")
+            try:
+                # Served by the partial index idx_pending_entries_pending_run (migration 015)
+                query = """
+                    UPDATE pending_entries 
+                    SET status = 'expired'
+                    WHERE status = 'pending' AND sync_run_id <> %s
+                """
+                explain_query(conn, query, (sync_run_id,))
+                cur.execute(query, (sync_run_id,))
+                expired_count = cur.rowcount
+                cur.execute("RELEASE SAVEPOINT expire_pending")
+            except psycopg2.Error as e:
+                cur.execute("ROLLBACK TO SAVEPOINT expire_pending")
+                expired_count = 0
+                print(f"WARNING: Failed to expire old pending entries: {e}")
             cur.close()
+            update_sync_run(conn, sync_run_id, stats, error_occurred)
             if expired_count > 0:
                 print(f"Expired {expired_count} old pending entries")
-        except Exception as e:
-            print(f"WARNING: Failed to expire old pending entries: {e}")
-    
-    if sync_run_id:
-        try:
-            conn = ensure_conn(conn)
-            update_sync_run(conn, sync_run_id, stats, error_occurred)
             print(f"Updated sync run: id={sync_run_id}")
         except Exception as e:
             print(f"WARNING: Failed to update sync run: {e}")
+            safe_rollback(conn)
     
-    # Close connection safely
-    if conn and getattr(conn, "closed", 1) == 0:
+    # Flush queued Telegram notifications (they store admin_message_id via the pool)
+    notifier_stopped = stop_notifier()
+    
+    # Return connection and close the pool safely (never under a still-running notifier)
+    release_conn(conn)
+    if notifier_stopped:
         try:
-            conn.close()
+            close_pool()
         except Exception as e:
             print(f"WARNING: Failed to close connection: {e}")
+    else:
+        print("WARNING: Leaving DB pool open for the running Telegram notifier")
     
     # Print statistics
     print("\n" + "="*50)
@@ -1485,6 +2190,32 @@ def main():
     total_notified = 0
     iteration = 0
     
+    # One keep-alive session for all backend calls (avoids a TLS handshake per batch).
+    # Batches stay sequential: process-new-entries does not lock the rows it picks,
+    # so concurrent calls would notify the same players twice.
+    # Transient 502/503 (backend not reached, e.g. Render restart), 429 and connect errors are
+    # retried with backoff, honoring Retry-After; 500/504 and read timeouts are not, since the
+    # backend may have processed (or still be processing) that batch.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=1,
+        max_retries=Retry(
+            total=3,
+            # Never re-send after a read timeout/error: the backend may still be processing
+            # that batch. read=False (not 0) re-raises ReadTimeoutError unwrapped, so requests
+            # raises Timeout and the handler below still sees it
+            read=False,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503],
+            allowed_methods=["POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    
     print(f"AUTO TG: start batching, limit={batch_limit}")
     
     try:
@@ -1493,7 +2224,7 @@ def main():
             endpoint_url = f"{backend_base_url}/admin/process-new-entries?limit={batch_limit}"
             
             try:
-                response = requests.post(endpoint_url, timeout=120)
+                response = session.post(endpoint_url, timeout=(10, 120))
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -1502,10 +2233,12 @@ def main():
                     total_processed += processed
                     total_notified += notified
                     
-                    print(f"AUTO TG: iter={iteration} status={response.status_code} processed={processed} notified={notified}")
+                    has_more = result.get('has_more')
+                    
+                    print(f"AUTO TG: iter={iteration} status={response.status_code} processed={processed} notified={notified} has_more={has_more}")
                     
-                    # If no entries processed, we're done
-                    if processed == 0:
+                    # Done when the backend reports nothing left (older backends: an empty batch)
+                    if processed == 0 or has_more is False:
                         break
                 else:
                     print(f"AUTO TG: iter={iteration} status={response.status_code} error={response.text[:100]}")
@@ -1522,7 +2255,6 @@ def main():
                 break
             except Exception as e:
                 print(f"AUTO TG: iter={iteration} ERROR: Unexpected error: {e}")
-                import traceback
                 traceback.print_exc()
                 # Stop batching on unexpected error
                 break
@@ -1534,7 +2266,6 @@ def main():
         
     except Exception as e:
         print(f"ERROR: Unexpected error in notification batching: {e}")
-        import traceback
         traceback.print_exc()
     
     print("="*50)
@@ -1549,7 +2280,7 @@ def main():
     
     try:
         endpoint_url = f"{backend_base_url}/admin/process-pending-players?limit={pending_limit}"
-        response = requests.post(endpoint_url, timeout=60)
+        response = session.post(endpoint_url, timeout=(10, 60))
         
         if response.status_code == 200:
             result = response.json()
@@ -1560,8 +2291,9 @@ def main():
             print(f"AUTO PENDING: status={response.status_code}, error={response.text}")
     except Exception as e:
         print(f"AUTO PENDING ERROR: {e}")
-        import traceback
         traceback.print_exc()
+    finally:
+        session.close()
     
     # Always return 0 (success) for launchd - errors are logged but don't fail the import
     return 0
@@ -4,21 +4,148 @@
 
 Использование:
     export LUNDA_JSON_PATH="/path/to/tournaments_database.json"
+    # JSON_DEBUG=1 prints tournament search diagnostics
     python scripts/json_add_participant.py \
         --tournament_starts_at "2026-01-05 15:00" \
         --location "K5 Padel | Санкт-Петербург" \
         --full_name "Player With TG"
+
+    # --append-log: record the add in <json>.participants.ndjson instead of rewriting the JSON;
+    # --compact folds the log into the JSON (run periodically, e.g. nightly)
+    python scripts/json_add_participant.py --append-log ...
+    python scripts/json_add_participant.py --compact
 """
 
 from dotenv import load_dotenv
 load_dotenv()
 
 import os
+import re
 import json
 import argparse
+import sys
+import mmap
 import shutil
+import pickle
+import hashlib
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+try:
+    import orjson  # optional: fast JSON parser/serializer
+except ImportError:
+    orjson = None
+try:
+    import ijson  # optional: streaming JSON parser
+except ImportError:
+    ijson = None
+
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson else (json.JSONDecodeError,)
+
+# orjson parses integers beyond 64 bits as floats; files with such long digit runs
+# (conservatively: 20+ digits anywhere) are parsed with stdlib json instead
+_LONG_NUMBER_RE = re.compile(rb'\d{20}')
+
+# Per-tournament search diagnostics (JSON_DEBUG=1)
+DEBUG = os.getenv("JSON_DEBUG") == "1"
+
+# Parsed JSON cache between runs (one file per database path),
+# invalidated by any change to the file's mtime/size
+CACHE_DIR = Path.home() / '.cache' / 'lunda'
+
+def _cache_path(json_path):
+    path_hash = hashlib.sha1(str(Path(json_path).resolve()).encode('utf-8')).hexdigest()[:16]
+    return CACHE_DIR / f'parsed-{path_hash}.pkl'
+
+def _cache_key(json_path):
+    st = os.stat(json_path)
+    return (str(Path(json_path).resolve()), st.st_mtime_ns, st.st_size)
+
+def read_cached_json(json_path):
+    """Return parsed data from the pickle cache if it matches json_path's current state, else None."""
+    try:
+        with open(_cache_path(json_path), 'rb') as f:
+            if pickle.load(f) != _cache_key(json_path):
+                return None
+            return pickle.load(f)
+    except Exception:
+        # Missing, stale-format or corrupt cache: fall back to parsing JSON
+        return None
+
+def write_cached_json(data, json_path):
+    """Store parsed data in the pickle cache keyed by json_path's current state (best effort)."""
+    cache_path = _cache_path(json_path)
+    tmp_path = cache_path.with_suffix('.tmp')
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(_cache_key(json_path), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        if DEBUG:
+            print(f"DEBUG: Failed to write JSON cache: {e}")
+
+def load_json(json_path):
+    """
+    Load JSON file (pickle cache if json_path is unchanged, else parse_json).
+    Does not write the cache: callers that modify the data cache it after saving.
+    """
+    data = read_cached_json(json_path)
+    if data is not None:
+        return data
+    return parse_json(json_path)
+
+def parse_json(json_path):
+    """
+    Parse JSON file (orjson if installed and lossless for the file, else stdlib json).
+    Raises json.JSONDecodeError on invalid JSON (orjson's error subclasses it).
+    """
+    if orjson is not None:
+        # Parse straight from the page cache: no file-sized bytes copy
+        with open(json_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return orjson.loads(b'')  # mmap can't map an empty file; raises JSONDecodeError
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if not _LONG_NUMBER_RE.search(mm):
+                    with memoryview(mm) as view:
+                        return orjson.loads(view)
+    
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_json(data, json_path):
+    """
+    Save JSON as UTF-8 with 2-space indent, like json.dump(..., ensure_ascii=False, indent=2).
+    With orjson the values are the same but floats may be formatted differently
+    (e.g. 1e22 instead of 1e+22); data orjson can't encode (integers beyond 64 bits,
+    non-str keys) is written with stdlib json.
+    Serialized in memory, written to a temp file and atomically renamed over json_path,
+    so readers never see a partially written file.
+    """
+    buf = None
+    if orjson is not None:
+        try:
+            buf = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass
+    if buf is None:
+        buf = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    # buf is fully encoded (including the fallback) before the temp file is opened,
+    # so an encode error never touches the disk
+    json_path = Path(json_path)
+    tmp_path = json_path.with_suffix(json_path.suffix + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(buf)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, json_path)
+    finally:
+        # No-op after a successful replace; removes a partial temp file on any error
+        tmp_path.unlink(missing_ok=True)
 
 def parse_datetime(date_str):
     """Parse datetime from various formats. Returns naive datetime."""
@@ -31,20 +158,43 @@ def parse_datetime(date_str):
     if not isinstance(date_str, str):
         raise ValueError(f"Expected string or datetime, got {type(date_str)}")
     
-    # Try ISO format first
-    formats = [
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%dT%H:%M:%S%z",
-        "%Y-%m-%dT%H:%M:%SZ",
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%d %H:%M",
-        "%Y-%m-%dT%H:%M",
-        "%Y-%m-%d %H:%M:%S.%f",  # With microseconds
-        "%Y-%m-%dT%H:%M:%S.%f",  # ISO with microseconds
-        "%Y-%m-%dT%H:%M:%S.%fZ",  # ISO with microseconds and Z
-    ]
-    
-    for fmt in formats:
+    return _parse_datetime_str(date_str)
+
+# Formats tried in order when the ISO fast path doesn't apply
+_DATETIME_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M:%S.%f",  # With microseconds
+    "%Y-%m-%dT%H:%M:%S.%f",  # ISO with microseconds
+    "%Y-%m-%dT%H:%M:%S.%fZ",  # ISO with microseconds and Z
+)
+
+# Shortest timestamp in _DATETIME_FORMATS: "YYYY-MM-DD HH:MM"
+_MIN_TIMESTAMP_LEN = 16
+
+@lru_cache(maxsize=4096)
+def _parse_datetime_str(date_str):
+    """
+    Parse datetime string. Memoized: tournaments often share start times.
+    Besides _DATETIME_FORMATS, full timestamps in other ISO 8601 shapes that
+    datetime.fromisoformat accepts (e.g. a Z or UTC offset on any of them,
+    basic format "20260105T150000") are accepted too. Date-only strings are not.
+    """
+    # Fast path: C-implemented ISO parser (3.11+ accepts all the formats below).
+    # Shorter strings skip it: fromisoformat would read "2026-01-05" as midnight
+    if len(date_str) >= _MIN_TIMESTAMP_LEN:
+        try:
+            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+            return dt.replace(tzinfo=None) if dt.tzinfo else dt
+        except ValueError:
+            pass
+    
+    # Non-ISO input (e.g. unpadded "2026-1-5 15:00"): strptime cascade
+    for fmt in _DATETIME_FORMATS:
         try:
             dt = datetime.strptime(date_str, fmt)
             # Make naive (remove timezone info for comparison)
@@ -56,96 +206,233 @@ def parse_datetime(date_str):
     
     raise ValueError(f"Unable to parse datetime: {date_str}")
 
-def find_tournament(data, starts_at, location):
-    """Find tournament in JSON by starts_at and location. Returns (tournament_data, tournament_info, tournaments_raw)."""
+def _datetime_key(dt):
+    """Second-resolution comparison key (microseconds ignored, no datetime allocation)."""
+    return (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
+
+@lru_cache(maxsize=4096)
+def _start_datetime_key(value):
+    """_datetime_key of a parsed start_datetime value, once per distinct value."""
+    return _datetime_key(parse_datetime(value))
+
+def iter_tournaments(data):
+    """Yield (key, tournament_data) from loaded JSON: dict key or list index."""
     tournaments_raw = data.get('tournaments', {})
-    
-    # Extract tournaments list from dict or use as-is if list
     if isinstance(tournaments_raw, dict):
-        tournaments_list = list(tournaments_raw.values())
-        tournaments_is_dict = True
+        yield from tournaments_raw.items()
     elif isinstance(tournaments_raw, list):
-        tournaments_list = tournaments_raw
-        tournaments_is_dict = False
-    else:
-        return None, None, None
+        yield from enumerate(tournaments_raw)
+
+def stream_tournaments(json_path):
+    """Yield (key, tournament_data) from JSON file one tournament at a time (requires ijson)."""
+    # Pass 1: find the tournaments container type from parse events (no objects built)
+    tournaments_event = None
+    with open(json_path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == 'tournaments':
+                tournaments_event = event
+                break
     
+    # Pass 2: stream tournament objects
+    with open(json_path, 'rb') as f:
+        if tournaments_event == 'start_map':
+            yield from ijson.kvitems(f, 'tournaments', use_float=True)
+        elif tournaments_event == 'start_array':
+            yield from enumerate(ijson.items(f, 'tournaments.item', use_float=True))
+
+def find_tournament(tournaments, starts_at, location):
+    """
+    Find tournament by starts_at and location in (key, tournament_data) pairs
+    (iter_tournaments or stream_tournaments). Stops at the first match.
+    Returns (key, tournament_data, tournament_info) or (None, None, None).
+    """
     # Normalize location for comparison
     location_normalized = (location or '').strip()
-    starts_at_normalized = starts_at.replace(microsecond=0)
-    
-    # Debug: print first few tournaments for comparison
-    print(f"DEBUG: Searching for location='{location_normalized}', starts_at={starts_at_normalized}")
-    print(f"DEBUG: Found {len(tournaments_list)} tournaments in JSON")
+    starts_at_key = _datetime_key(starts_at)
+    location_lower = location_normalized.lower()
+    strip = str.strip  # bound once for the loop
     
-    # Also search in title if location doesn't match (sometimes location is in title)
-    search_in_title = False
+    if DEBUG:
+        print(f"DEBUG: Searching for location='{location_normalized}', starts_at={starts_at.replace(microsecond=0)}")
     
-    for idx, tournament_data in enumerate(tournaments_list):
-        tournament_info = tournament_data.get('tournament', {})
-        tournament_location = (tournament_info.get('location', '') or '').strip()
-        tournament_title = (tournament_info.get('title', '') or '').strip()
+    for idx, (key, tournament_data) in enumerate(tournaments):
+        tournament_info = tournament_data.get('tournament') or {}
+        get_info = tournament_info.get
+        tournament_location = strip(get_info('location') or '')
+        tournament_title = strip(get_info('title') or '')
         tournament_starts_at_str = tournament_data.get('start_datetime')
         
         # Debug: print first 5 tournaments and any that match location partially
-        if idx < 5 or location_normalized.lower() in tournament_location.lower() or location_normalized.lower() in tournament_title.lower():
+        if DEBUG and (idx < 5 or location_lower in tournament_location.lower() or location_lower in tournament_title.lower()):
             print(f"DEBUG: Tournament {idx}: title='{tournament_title}', location='{tournament_location}', start='{tournament_starts_at_str}'")
         
-        if not tournament_starts_at_str:
+        # Compare: location can match either tournament.location OR tournament.title
+        # (sometimes location is stored in title field).
+        # Cheap string check first: start_datetime is parsed only for location matches
+        location_match = (tournament_location == location_normalized or 
+                         tournament_title == location_normalized)
+        if not location_match or not tournament_starts_at_str:
             continue
         
         try:
-            tournament_starts_at = parse_datetime(tournament_starts_at_str)
-            # Normalize for comparison (remove microseconds if any)
-            tournament_starts_at = tournament_starts_at.replace(microsecond=0)
+            tournament_starts_at_key = _start_datetime_key(tournament_starts_at_str)
         except (ValueError, TypeError) as e:
-            if idx < 5:
+            if DEBUG:
                 print(f"DEBUG: Failed to parse datetime '{tournament_starts_at_str}': {e}")
             continue
         
-        # Compare: location can match either tournament.location OR tournament.title
-        # (sometimes location is stored in title field)
-        location_match = (tournament_location == location_normalized or 
-                         tournament_title == location_normalized)
-        datetime_match = tournament_starts_at == starts_at_normalized
-        
-        if location_match or datetime_match:
+        datetime_match = tournament_starts_at_key == starts_at_key
+        if DEBUG:
             print(f"DEBUG: Match check: location_match={location_match} (loc='{tournament_location}' == '{location_normalized}' or title='{tournament_title}' == '{location_normalized}'), datetime_match={datetime_match}")
         
-        if location_match and datetime_match:
-            return tournament_data, tournament_info, tournaments_raw
+        if datetime_match:
+            return key, tournament_data, tournament_info
     
     return None, None, None
 
-def add_participant(tournament_data, full_name):
-    """Add participant to tournament if not already present. Returns (added, was_present)."""
-    participants = tournament_data.get('participants', [])
-    
-    # Normalize full_name for comparison
+def has_participant(tournament_data, full_name):
+    """Check if participant (stripped full_name) is already in tournament."""
     full_name_normalized = full_name.strip()
+    # Single lookup per run: a short-circuit scan beats building a set of all names
+    return any(p and p.strip() == full_name_normalized for p in tournament_data.get('participants', []))
+
+def participant_set(tournament_data):
+    """Interned stripped participant names, for repeated lookups in one tournament."""
+    return {sys.intern(p.strip()) for p in tournament_data.get('participants', []) if p}
+
+def add_participant(tournament_data, full_name, existing=None):
+    """
+    Add participant to tournament if not already present. Returns (added, was_present).
+    existing: optional participant_set(tournament_data), kept in sync, for batched adds.
+    """
+    # Normalize full_name for comparison and storage
+    full_name_normalized = sys.intern(full_name.strip())
     
     # Check if already present
-    for p in participants:
-        if p and p.strip() == full_name_normalized:
+    if existing is not None:
+        if full_name_normalized in existing:
             return False, True  # was_present = True
+        existing.add(full_name_normalized)
+    elif has_participant(tournament_data, full_name_normalized):
+        return False, True  # was_present = True
     
     # Add participant
-    if not participants:
+    if not tournament_data.get('participants'):
         tournament_data['participants'] = []
     
     tournament_data['participants'].append(full_name_normalized)
     return True, False  # added = True, was_present = False
 
+def append_log_path(json_path):
+    """Sidecar NDJSON log of participant adds not yet folded into json_path."""
+    return json_path.with_suffix(json_path.suffix + '.participants.ndjson')
+
+def append_to_log(json_path, starts_at, location, full_name):
+    """Append one add record to the sidecar log (O(record) instead of an O(file) rewrite)."""
+    record = {'starts_at': starts_at.isoformat(), 'location': location, 'full_name': full_name.strip()}
+    if orjson is not None:
+        line = orjson.dumps(record) + b'\n'
+    else:
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+    # Single write on an O_APPEND file: concurrent appenders don't interleave lines
+    with open(append_log_path(json_path), 'ab') as f:
+        f.write(line)
+
+def backup_and_save(data, json_path):
+    """Hardlink the current file to .bak and save data over json_path."""
+    backup_path = json_path.with_suffix(json_path.suffix + '.bak')
+    print(f"Creating backup: {backup_path}")
+    # Hardlink: no data copy. save_json replaces json_path with a new file,
+    # so the backup keeps pointing at the old contents
+    backup_path.unlink(missing_ok=True)
+    try:
+        os.link(json_path, backup_path)
+    except OSError:
+        # Filesystem without hardlinks
+        shutil.copy2(json_path, backup_path)
+    
+    print(f"Saving JSON to: {json_path}")
+    save_json(data, json_path)
+    write_cached_json(data, json_path)
+
+def compact_log(json_path):
+    """Fold the sidecar log into the JSON file with one load and one save."""
+    log_path = append_log_path(json_path)
+    # Take the log out of the way first: adds arriving during compaction go to a fresh log.
+    # A leftover .compacting file (failed previous run) is folded in again; adds are idempotent.
+    compacting_path = log_path.with_suffix(log_path.suffix + '.compacting')
+    if log_path.exists():
+        if compacting_path.exists():
+            with open(compacting_path, 'ab') as dst, open(log_path, 'rb') as src:
+                shutil.copyfileobj(src, dst)
+            log_path.unlink()
+        else:
+            os.replace(log_path, compacting_path)
+    if not compacting_path.exists():
+        print(f"OK: nothing to compact")
+        return 0
+    
+    try:
+        data = load_json(json_path)
+    except json.JSONDecodeError as e:
+        print(f"ERROR: Invalid JSON: {e}")
+        return 1
+    
+    added = skipped = not_found = 0
+    # Many records can target the same tournament: one name set per tournament
+    existing_by_tournament = {}
+    with open(compacting_path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                starts_at = parse_datetime(record['starts_at'])
+                full_name = record.get('full_name')
+                if not isinstance(full_name, str) or not full_name.strip():
+                    raise ValueError("missing full_name")
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                print(f"WARNING: Skipping bad log line: {e}")
+                skipped += 1
+                continue
+            _, tournament_data, _ = find_tournament(iter_tournaments(data), starts_at, record.get('location'))
+            if not tournament_data:
+                print(f"WARNING: Tournament not found: {record.get('location')} {starts_at}")
+                not_found += 1
+                continue
+            existing = existing_by_tournament.get(id(tournament_data))
+            if existing is None:
+                existing = existing_by_tournament[id(tournament_data)] = participant_set(tournament_data)
+            was_added, _ = add_participant(tournament_data, full_name, existing)
+            added += was_added
+    
+    if added:
+        try:
+            backup_and_save(data, json_path)
+        except Exception as e:
+            print(f"ERROR: Failed to save JSON: {e}")
+            return 1
+    compacting_path.unlink()
+    
+    print(f"OK: compacted, added={added}, not_found={not_found}, skipped={skipped}")
+    return 0
+
 def main():
     parser = argparse.ArgumentParser(description='Add participant to tournament JSON')
-    parser.add_argument('--tournament_starts_at', required=True,
+    parser.add_argument('--tournament_starts_at',
                         help='Tournament start datetime (e.g., "2026-01-05 15:00" or ISO format)')
-    parser.add_argument('--location', required=True,
+    parser.add_argument('--location',
                         help='Tournament location or title (searches in both fields)')
-    parser.add_argument('--full_name', required=True,
+    parser.add_argument('--full_name',
                         help='Full name of participant to add')
+    parser.add_argument('--append-log', action='store_true',
+                        help='Append the add to the sidecar log instead of rewriting the JSON')
+    parser.add_argument('--compact', action='store_true',
+                        help='Fold the sidecar log into the JSON and exit')
     
     args = parser.parse_args()
+    if not args.compact and not (args.tournament_starts_at and args.location and args.full_name):
+        parser.error('--tournament_starts_at, --location and --full_name are required (unless --compact)')
     
     # Get JSON path from env
     json_path = os.getenv("LUNDA_JSON_PATH")
@@ -158,6 +445,9 @@ def main():
         print(f"ERROR: File not found: {json_path}")
         return 1
     
+    if args.compact:
+        return compact_log(json_path)
+    
     # Parse datetime
     try:
         starts_at = parse_datetime(args.tournament_starts_at)
@@ -165,18 +455,23 @@ def main():
         print(f"ERROR: {e}")
         return 1
     
-    # Load JSON
+    # Find tournament: stream with ijson (stops at the match, no full load),
+    # load the whole file only when it has to be modified
     print(f"Loading JSON from: {json_path}")
+    data = read_cached_json(json_path)
+    parsed = False  # data parsed from JSON on this run (not cached yet)
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
+        if data is None and ijson is not None:
+            key, tournament_data, tournament_info = find_tournament(stream_tournaments(json_path), starts_at, args.location)
+        else:
+            if data is None:
+                data = parse_json(json_path)
+                parsed = True
+            key, tournament_data, tournament_info = find_tournament(iter_tournaments(data), starts_at, args.location)
+    except JSON_ERRORS as e:
         print(f"ERROR: Invalid JSON: {e}")
         return 1
     
-    # Find tournament
-    tournament_data, tournament_info, tournaments_raw = find_tournament(data, starts_at, args.location)
-    
     if not tournament_data:
         print(f"ERROR: Tournament not found")
         print(f"  Location: {args.location}")
@@ -188,28 +483,39 @@ def main():
     tournament_title = tournament_info.get('title', 'Unknown')
     print(f"Found tournament: {tournament_title}")
     
-    # Add participant
-    added, was_present = add_participant(tournament_data, args.full_name)
-    
-    if was_present:
+    if has_participant(tournament_data, args.full_name):
+        if parsed:
+            write_cached_json(data, json_path)
         print(f"OK: already present")
         print(f"Tournament: {tournament_title}")
         return 0
     
-    # Create backup
-    backup_path = json_path.with_suffix(json_path.suffix + '.bak')
-    print(f"Creating backup: {backup_path}")
-    shutil.copy2(json_path, backup_path)
+    if args.append_log:
+        append_to_log(json_path, starts_at, args.location, args.full_name)
+        if parsed:
+            write_cached_json(data, json_path)
+        print(f"OK: logged")
+        print(f"Tournament: {tournament_title}")
+        print(f"Participant: {args.full_name}")
+        return 0
     
-    # Save JSON (preserve original structure)
-    print(f"Saving JSON to: {json_path}")
+    if data is None:
+        try:
+            data = load_json(json_path)
+        except json.JSONDecodeError as e:
+            print(f"ERROR: Invalid JSON: {e}")
+            return 1
+        tournament_data = data['tournaments'][key]
+    
+    # Add participant
+    add_participant(tournament_data, args.full_name)
+    
+    # Backup and save JSON (preserve original structure)
     try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        backup_and_save(data, json_path)
     except Exception as e:
+        # Original file is untouched (atomic replace), nothing to restore
         print(f"ERROR: Failed to save JSON: {e}")
-        # Restore from backup
-        shutil.copy2(backup_path, json_path)
         return 1
     
     print(f"OK: added")